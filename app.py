@@ -1,5 +1,12 @@
+import os
 import streamlit as st
 
+import encoder
+
+# Load the embedding model in the background so the first match doesn't pay for it.
+if os.environ.get("HIRESIGHT_WARMUP", "1") != "0":
+    encoder.warm_up(background=True)
+
 st.set_page_config(
     page_title="HireSight",
     page_icon="🧠",
@@ -0,0 +1,78 @@
+import asyncio
+import random
+
+import llm
+from processor import analyze_resume, get_default_backend
+
+# --- Concurrent Analysis ---
+# Fans one resume out across many jobs. Blocking backend calls run in worker
+# threads, at most `concurrency` at a time, and results are yielded as they finish.
+# A call that times out is reported at once, but its thread cannot be stopped, so
+# its concurrency slot is only freed when the call actually returns.
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+
+
+async def _analyze_with_retry(resume_text, jd_text, backend, timeout, retries, backoff, semaphore):
+    for attempt in range(retries + 1):
+        await semaphore.acquire()
+        call = asyncio.ensure_future(
+            asyncio.to_thread(analyze_resume, resume_text, jd_text, backend, raise_overloaded=True)
+        )
+        call.add_done_callback(lambda _: semaphore.release())
+        try:
+            # shield(): a timeout stops the wait, not the call, which keeps its slot until it returns.
+            return await asyncio.wait_for(asyncio.shield(call), timeout)
+        except llm.OverloadedError:
+            if attempt == retries:
+                return {"error": f"The AI model is still overloaded after {retries + 1} attempts. Please try again later."}
+            # Exponential backoff with jitter so concurrent retries do not arrive together.
+            await asyncio.sleep(backoff * 2 ** attempt * (1 + random.random()))
+        except asyncio.TimeoutError:
+            return {"error": f"The AI analysis timed out after {timeout:.0f} seconds."}
+
+
+async def analyze_across_jobs(resume_text, jobs, backend=None, concurrency=DEFAULT_CONCURRENCY,
+                              timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Analyze one resume against every job, yielding (job, result) as each finishes.
+
+    `jobs` are dicts with a 'description_full' key, as returned by
+    recommend_jobs. Overloaded responses are retried with exponential backoff;
+    timeouts and other failures come back as {"error": ...} results.
+    """
+    if backend is None:
+        backend = get_default_backend()
+    if isinstance(backend, dict):
+        for job in jobs:
+            yield job, backend
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        result = await _analyze_with_retry(
+            resume_text, job['description_full'], backend, timeout, retries, backoff, semaphore
+        )
+        return job, result
+
+    tasks = [asyncio.create_task(run(job)) for job in jobs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def analyze_across_jobs_sync(resume_text, jobs, on_result, **kwargs):
+    """Run analyze_across_jobs from synchronous code (e.g. a Streamlit script).
+
+    `on_result(job, result)` is called as each analysis completes.
+    """
+    async def consume():
+        async for job, result in analyze_across_jobs(resume_text, jobs, **kwargs):
+            on_result(job, result)
+
+    asyncio.run(consume())
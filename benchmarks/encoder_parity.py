@@ -0,0 +1,108 @@
+"""Parity and throughput check for the encoder backends.
+
+Run from the project root:
+
+    python -m benchmarks.encoder_parity [--threads 1 2 4] [--repeat 3]
+
+Embeds the bundled data/*.pdf files with the fp32 baseline and with every other
+backend in encoder.BACKENDS. Reports each backend's cosine drift from fp32: per
+document, on the resume x JD soft scores, and whether the top resume per JD
+changes. Also reports documents/s for each backend and thread count, with and
+without length-bucketed batching.
+"""
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+import main
+import encoder
+import metrics
+from benchmarks.pipeline import DATA_DIR, RESULTS_DIR, git_revision
+
+
+def load_documents():
+    resume_files, jd_files = main.list_documents(DATA_DIR)
+    resumes = [main.extract_resume_text(os.path.join(DATA_DIR, f)) for f in resume_files]
+    jds = [main.extract_jd_text(os.path.join(DATA_DIR, f)) for f in jd_files]
+    return resumes, jds
+
+
+def parity(baseline, candidate, n_resumes):
+    """Drift of `candidate` embeddings from `baseline` (rows: resumes, then JDs)."""
+    self_cosine = np.sum(baseline * candidate, axis=1)
+    base_scores = (baseline[:n_resumes] @ baseline[n_resumes:].T + 1) / 2 * 50
+    cand_scores = (candidate[:n_resumes] @ candidate[n_resumes:].T + 1) / 2 * 50
+    return {
+        'min_self_cosine': float(self_cosine.min()),
+        'mean_self_cosine': float(self_cosine.mean()),
+        'max_soft_score_diff': float(np.abs(base_scores - cand_scores).max()),
+        'mean_soft_score_diff': float(np.abs(base_scores - cand_scores).mean()),
+        'top_resume_agreement': float(np.mean(base_scores.argmax(axis=0) == cand_scores.argmax(axis=0))),
+    }
+
+
+def throughput(encode, texts, repeat):
+    encode(texts[:2])  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode(texts)
+    elapsed = time.perf_counter() - start
+    return len(texts) * repeat / elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[0],
+                        help="torch intra-op thread counts to try (0 = torch default).")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over the corpus per throughput measurement.")
+    parser.add_argument('--corpus-copies', type=int, default=20,
+                        help="Repeat the bundled documents this many times for throughput runs.")
+    parser.add_argument('--output', help="Where to write the JSON report (default: output/benchmarks/).")
+    args = parser.parse_args()
+
+    metrics.ENABLED = False
+    resumes, jds = load_documents()
+    texts = resumes + jds
+    # Mixed lengths (full documents and short sections) show the effect of bucketing.
+    corpus = (texts + [text[:300] for text in texts]) * args.corpus_copies
+
+    report = {'git_revision': git_revision(), 'documents': len(texts), 'parity': {}, 'throughput': []}
+    embeddings = {}
+    for threads in args.threads:
+        for backend in encoder.BACKENDS:
+            model = encoder.load_model(backend, threads)
+            if backend not in embeddings:
+                embeddings[backend] = encoder.encode(texts, model=model)
+            strategies = {
+                'bucketed': lambda batch: encoder.encode(batch, model=model),
+                # The previous behaviour: one call with a fixed batch size of 32.
+                'fixed': lambda batch: model.encode(batch, batch_size=32, convert_to_numpy=True,
+                                                    normalize_embeddings=True),
+            }
+            for label, encode in strategies.items():
+                rate = throughput(encode, corpus, args.repeat)
+                report['throughput'].append({
+                    'backend': backend, 'threads': threads, 'batching': label, 'docs_per_s': rate
+                })
+                print(f"{backend:<5} threads={threads or 'default':<8} {label:<9} {rate:>9.1f} docs/s")
+
+    for backend in encoder.BACKENDS:
+        if backend == 'fp32':
+            continue
+        report['parity'][backend] = parity(embeddings['fp32'], embeddings[backend], len(resumes))
+        print(f"\n{backend} vs fp32:")
+        for key, value in report['parity'][backend].items():
+            print(f"  {key:<22} {value:.4f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"encoder-parity-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nSaved results to '{output}'")
+
+
+if __name__ == '__main__':
+    main_cli()
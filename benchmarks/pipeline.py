@@ -0,0 +1,209 @@
+"""Per-stage benchmark of the scoring pipeline.
+
+Run from the project root:
+
+    python -m benchmarks.pipeline [--encoder stub] [--synthetic 10000 --synthetic-jds 40]
+    python -m benchmarks.pipeline --compare output/benchmarks/<earlier run>.json
+
+Times extract_resume_text, parse_resume_sections, hard_match_score,
+soft_match_score and end-to-end batch scoring on the bundled data/*.pdf files,
+and the text stages again on a synthetic corpus. Results are saved as JSON
+under output/benchmarks/ so runs from different commits can be compared.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import platform
+import argparse
+import statistics
+import subprocess
+
+import main
+import encoder
+import metrics
+import embedding_store
+import text_cache
+from benchmarks.synthetic import generate_corpus
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'output', 'benchmarks')
+
+
+def time_calls(func, items, repeat=1):
+    """Call func(item) for every item, `repeat` times; return per-call timing stats."""
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def time_once(func, items_processed):
+    """Time a single call that processes `items_processed` items."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return {
+        'calls': 1,
+        'items': items_processed,
+        'total_s': elapsed,
+        'items_per_s': items_processed / elapsed if elapsed else None,
+    }
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {
+        'calls': len(samples),
+        'items': len(samples),
+        'total_s': total,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        'items_per_s': len(samples) / total if total else None,
+    }
+
+
+def bench_bundled(repeat):
+    """Stages on the real PDFs in data/."""
+    resume_files, jd_files = main.list_documents(DATA_DIR)
+    resume_paths = [os.path.join(DATA_DIR, f) for f in resume_files]
+    jd_paths = [os.path.join(DATA_DIR, f) for f in jd_files]
+    stages = {}
+
+    # Cold extraction goes through extraction.py; warm extraction is served by text_cache.
+    text_cache.clear()
+    stages['extract_resume_text.cold'] = time_calls(main.extract_resume_text, resume_paths)
+    stages['extract_resume_text.cached'] = time_calls(main.extract_resume_text, resume_paths, repeat)
+
+    resume_texts = [main.extract_resume_text(path) for path in resume_paths]
+    jd_texts = [main.extract_jd_text(path) for path in jd_paths]
+    # __wrapped__ bypasses the section cache so the parser itself is measured.
+    parse_resume = main.parse_resume_sections.__wrapped__
+    parse_jd = main.parse_jd_sections.__wrapped__
+    stages['parse_resume_sections'] = time_calls(parse_resume, resume_texts, repeat)
+
+    resume_skills = [parse_resume(text)['skills'] for text in resume_texts]
+    jd_skills = [parse_jd(text)['must_have_skills'] for text in jd_texts]
+    pairs = [(r, j) for r in resume_skills for j in jd_skills]
+    stages['hard_match_score'] = time_calls(lambda pair: main.hard_match_score(*pair), pairs, repeat)
+
+    text_pairs = [(r, j) for r in resume_texts for j in jd_texts]
+    encoder.encode(['warm up'])  # Keep model loading out of the per-pair numbers.
+    stages['soft_match_score'] = time_calls(lambda pair: main.soft_match_score(*pair), text_pairs, repeat)
+
+    text_cache.clear()
+    stages['main.score_batch.cold'] = time_once(
+        lambda: main.score_batch(resume_paths, jd_paths), len(resume_paths) * len(jd_paths)
+    )
+    stages['main.score_batch.cached'] = time_once(
+        lambda: main.score_batch(resume_paths, jd_paths), len(resume_paths) * len(jd_paths)
+    )
+    return stages
+
+
+def bench_synthetic(n_resumes, n_jds, seed):
+    """Text stages on a generated corpus, to see how they scale."""
+    resume_texts, jd_texts = generate_corpus(n_resumes, n_jds, seed)
+    parse_resume = main.parse_resume_sections.__wrapped__
+    parse_jd = main.parse_jd_sections.__wrapped__
+    stages = {}
+
+    stages['parse_resume_sections'] = time_calls(parse_resume, resume_texts)
+    resume_skills = [parse_resume(text)['skills'] for text in resume_texts]
+    jd_skills = [parse_jd(text)['must_have_skills'] for text in jd_texts]
+
+    # A sample of pairs keeps the per-call stage affordable at 10k+ documents.
+    sample = [(r, j) for r in resume_skills[:1000] for j in jd_skills[:10]]
+    stages['hard_match_score'] = time_calls(lambda pair: main.hard_match_score(*pair), sample)
+
+    stages['soft_match.batched_encode'] = time_once(
+        lambda: encoder.cosine_matrix(encoder.encode(resume_texts), encoder.encode(jd_texts)),
+        len(resume_texts) + len(jd_texts)
+    )
+    return stages
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_report(report, baseline=None):
+    for suite, stages in report['suites'].items():
+        print(f"\n[{suite}]")
+        for stage, stats in stages.items():
+            line = f"  {stage:<32} {stats['total_s']:>9.3f}s total"
+            if 'p50_ms' in stats:
+                line += f"  p50 {stats['p50_ms']:>9.3f} ms  p95 {stats['p95_ms']:>9.3f} ms"
+            if stats.get('items_per_s'):
+                line += f"  {stats['items_per_s']:>10.1f} items/s"
+            before = (baseline or {}).get('suites', {}).get(suite, {}).get(stage)
+            if before and before.get('items_per_s') and stats.get('items_per_s'):
+                change = stats['items_per_s'] / before['items_per_s'] - 1
+                line += f"  ({change:+.1%} vs {baseline['git_revision']})"
+            print(line)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--encoder', choices=['model', 'stub'], default='model',
+                        help="'stub' swaps in encoder.StubModel so the suite runs offline.")
+    parser.add_argument('--repeat', type=int, default=3, help="Repetitions for per-call stages on bundled data.")
+    parser.add_argument('--synthetic', type=int, default=1000, help="Synthetic resumes to generate (0 to skip).")
+    parser.add_argument('--synthetic-jds', type=int, default=20, help="Synthetic JDs to generate.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', help="Earlier benchmark JSON to compare throughput against.")
+    parser.add_argument('--output', help="Where to write the JSON report (default: output/benchmarks/<time>-<rev>.json).")
+    args = parser.parse_args()
+
+    # Keep benchmark samples out of the app's latency dashboard.
+    metrics.ENABLED = False
+    if args.encoder == 'stub':
+        encoder.set_model(encoder.StubModel())
+
+    # Benchmark against a private text cache and embedding store so the real ones are left untouched.
+    cache_dir = tempfile.mkdtemp(prefix='hiresight-bench-')
+    text_cache.CACHE_DIR = cache_dir
+    text_cache.CACHE_PATH = os.path.join(cache_dir, 'text_cache.db')
+    embedding_store.STORE_DIR = os.path.join(cache_dir, 'embeddings')
+
+    report = {
+        'git_revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'encoder': args.encoder,
+        'suites': {'bundled': bench_bundled(args.repeat)},
+    }
+    if args.synthetic:
+        report['synthetic'] = {'resumes': args.synthetic, 'jds': args.synthetic_jds, 'seed': args.seed}
+        report['suites']['synthetic'] = bench_synthetic(args.synthetic, args.synthetic_jds, args.seed)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{report['git_revision']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nSaved benchmark results to '{output}'")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,54 @@
+"""Token counts of the analysis prompt before and after compaction.
+
+Run from the project root:
+
+    python -m benchmarks.prompt_budget [--context-tokens 1024] [--max-output-tokens 384]
+
+Builds the prompt for every resume x JD pair in data/ and prints the estimated
+input tokens of the full-text prompt against the compacted one, plus the output
+token budget the model is allowed (previously a fixed 1500).
+"""
+import os
+import argparse
+
+import main
+import metrics
+import prompt_builder
+from benchmarks.pipeline import DATA_DIR
+
+PREVIOUS_MAX_OUTPUT_TOKENS = 1500
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--context-tokens', type=int, default=prompt_builder.CONTEXT_TOKENS)
+    parser.add_argument('--max-output-tokens', type=int, default=prompt_builder.MAX_OUTPUT_TOKENS)
+    args = parser.parse_args()
+
+    metrics.ENABLED = False
+    resume_files, jd_files = main.list_documents(DATA_DIR)
+    jds = {f: main.extract_jd_text(os.path.join(DATA_DIR, f)) for f in jd_files}
+
+    print(f"{'Resume':<24} {'JD':<18} {'Full':>7} {'Compact':>8} {'Saved':>7}")
+    full_total = compact_total = 0
+    for resume_file in resume_files:
+        resume_text = main.extract_resume_text(os.path.join(DATA_DIR, resume_file))
+        for jd_file, jd_text in jds.items():
+            report = prompt_builder.build_prompt(
+                resume_text, jd_text, args.context_tokens, args.max_output_tokens
+            )['report']
+            full_total += report['full_prompt_tokens']
+            compact_total += report['prompt_tokens']
+            saved = 1 - report['prompt_tokens'] / report['full_prompt_tokens']
+            print(f"{resume_file[:24]:<24} {jd_file[:18]:<18} {report['full_prompt_tokens']:>7} "
+                  f"{report['prompt_tokens']:>8} {saved:>7.0%}")
+
+    pairs = len(resume_files) * len(jds)
+    if pairs:
+        print(f"\nInput tokens per call: {full_total / pairs:.0f} -> {compact_total / pairs:.0f} "
+              f"(budget {args.context_tokens - args.max_output_tokens})")
+        print(f"Output token budget per call: {PREVIOUS_MAX_OUTPUT_TOKENS} -> {args.max_output_tokens}")
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,80 @@
+"""Cold-start benchmark: import time per module for each entry point.
+
+Run from the project root:
+
+    python -m benchmarks.startup [--top 15] [--json output/benchmarks/startup.json]
+
+Each target runs in a fresh interpreter with `-X importtime`, so every
+measurement is a true cold import. Streamlit pages execute in bare mode.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = [
+    'app.py',
+    'pages/1_Recruiter_Admin_Panel.py',
+    'pages/2_Job_Seeker_Portal.py',
+    'main.py',
+]
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(target):
+    """Run `target` in a fresh interpreter and collect -X importtime samples."""
+    # run_name keeps main.py from starting a scoring run; pages still execute their top level.
+    code = f"import runpy; runpy.run_path({target!r}, run_name='__startup_benchmark__')"
+    env = dict(os.environ, HIRESIGHT_WARMUP='0')
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': (len(indent) - 1) // 2,
+            })
+    return {
+        'target': target,
+        'wall_s': wall,
+        'returncode': proc.returncode,
+        'import_ms': sum(m['self_ms'] for m in modules),
+        'top_level': sorted((m for m in modules if m['depth'] == 0), key=lambda m: -m['cumulative_ms']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15, help="Top-level imports to show per target.")
+    parser.add_argument('--json', help="Also write the full report to this JSON file.")
+    args = parser.parse_args()
+
+    report = [measure(target) for target in TARGETS]
+    for result in report:
+        status = '' if result['returncode'] == 0 else f"  (exited with {result['returncode']})"
+        print(f"\n{result['target']}: {result['wall_s']:.2f}s wall, {result['import_ms']:.0f} ms in imports{status}")
+        for module in result['top_level'][:args.top]:
+            print(f"  {module['cumulative_ms']:>9.1f} ms  {module['module']}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
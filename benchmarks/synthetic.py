@@ -0,0 +1,69 @@
+"""Synthetic resume and JD generator for benchmarks.
+
+Documents follow the section layout the parsers expect (Objective, Skills,
+Experience, Education for resumes; Skills Required for JDs), are generated
+lazily and are reproducible from a seed, so corpora of 10k+ documents cost
+no disk space.
+"""
+import random
+
+SKILLS = [
+    'Python', 'SQL', 'R', 'Excel', 'Pandas', 'NumPy', 'Scikit-learn', 'TensorFlow', 'PyTorch',
+    'Power BI', 'Tableau', 'Matplotlib', 'Seaborn', 'BeautifulSoup', 'Spark', 'Hadoop', 'AWS',
+    'Azure', 'GCP', 'Docker', 'Kubernetes', 'Git', 'Java', 'JavaScript', 'React', 'Node.js',
+    'Flask', 'Django', 'FastAPI', 'PostgreSQL', 'MongoDB', 'Airflow', 'Statistics', 'Machine Learning',
+    'Deep Learning', 'NLP', 'Computer Vision', 'Data Visualization', 'ETL', 'Linux',
+    'Mechanical Design', 'Manufacturing', 'AutoCAD', 'SolidWorks', 'Six Sigma', 'Lean',
+]
+ROLES = [
+    'Data Analyst', 'Data Scientist', 'Machine Learning Engineer', 'Backend Developer',
+    'Frontend Developer', 'Mechanical Engineer', 'Business Analyst', 'Data Engineer',
+]
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Analytics', 'Axion Ray', 'Stark Industries']
+DEGREES = ['Bachelor of Science in Physics', 'Bachelor of Technology in Computer Science',
+           'Master of Science in Statistics', 'Bachelor of Engineering in Mechanical Engineering']
+SCHOOLS = ['Bharti Vidyapeeth Pune', 'IIT Bombay', 'University of Delhi', 'Anna University']
+FILLER = [
+    'Built dashboards that cut reporting time in half.',
+    'Collaborated with cross-functional teams to define metrics.',
+    'Automated data pipelines and improved data quality.',
+    'Presented insights to senior stakeholders every quarter.',
+    'Designed experiments and analysed their outcomes.',
+    'Mentored junior team members and reviewed their work.',
+]
+
+
+def generate_resume(rng, filler_sentences=6):
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    experience = [
+        f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({rng.randint(2012, 2020)}-{rng.randint(2021, 2025)}). "
+        + " ".join(rng.choice(FILLER) for _ in range(filler_sentences))
+        for _ in range(rng.randint(1, 3))
+    ]
+    return (
+        f"Objective: Detail-oriented {role} with hands-on work in {', '.join(skills[:3])}. "
+        f"Skills: {', '.join(skills)} "
+        f"Experience: {' '.join(experience)} "
+        f"Education: {rng.choice(DEGREES)} {rng.randint(2010, 2022)} {rng.choice(SCHOOLS)} "
+        f"Projects: {rng.choice(FILLER)}"
+    )
+
+
+def generate_jd(rng, filler_sentences=8):
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, rng.randint(4, 8))
+    return (
+        f"{role} at {rng.choice(COMPANIES)}. "
+        + " ".join(rng.choice(FILLER) for _ in range(filler_sentences))
+        + f" Skills Required: {', '.join(skills)} "
+        f"Experience: {rng.randint(1, 8)}+ years in a similar role."
+    )
+
+
+def generate_corpus(n_resumes, n_jds, seed=0):
+    """Return (resume_texts, jd_texts) of the requested sizes, reproducible from `seed`."""
+    rng = random.Random(seed)
+    resumes = [generate_resume(rng) for _ in range(n_resumes)]
+    jds = [generate_jd(rng) for _ in range(n_jds)]
+    return resumes, jds
@@ -0,0 +1,234 @@
+import os
+import json
+import time
+
+import numpy as np
+
+import main
+import metrics
+import processor
+import embedding_store
+from skill_matcher import SkillMatcher
+
+# --- Cascade Ranking ---
+# Ranks every stored candidate for one job in three stages, each narrowing the
+# pool for a more expensive one:
+#   1. prefilter: cosine between the job vector and every canonical resume
+#      vector, scanned from the 'candidates' embedding store;
+#   2. rerank: hard (skill) + soft (cosine) score of the prefilter survivors;
+#   3. analysis: analyze_resume on the top reranked candidates, spending at most
+#      `llm_budget` fresh LLM calls per job over LLM_BUDGET_WINDOW_HOURS, summed
+#      across runs (cached analyses are free). A run reserves its calls in its
+#      cascade_runs row before making any, so concurrent runs cannot overspend.
+# Only stage 1 grows with the applicant pool, and it is one vector scan, so a
+# ranking takes about the same time for a hundred resumes as for a hundred thousand.
+PREFILTER_K = int(os.environ.get('HIRESIGHT_CASCADE_PREFILTER_K', '200'))
+RERANK_K = int(os.environ.get('HIRESIGHT_CASCADE_RERANK_K', '25'))
+ANALYZE_K = int(os.environ.get('HIRESIGHT_CASCADE_ANALYZE_K', '10'))
+LLM_BUDGET = int(os.environ.get('HIRESIGHT_CASCADE_LLM_BUDGET', '5'))
+LLM_BUDGET_WINDOW_HOURS = float(os.environ.get('HIRESIGHT_CASCADE_LLM_BUDGET_WINDOW_HOURS', '24'))
+CANDIDATE_STORE = 'candidates'  # Canonical resume vectors keyed by dedup fingerprint.
+
+_schema_ready = False
+
+
+def _connect():
+    global _schema_ready
+    conn = processor.get_connection()
+    if not _schema_ready:
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cascade_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id INTEGER NOT NULL,
+                    started_at REAL NOT NULL,
+                    report TEXT NOT NULL,
+                    llm_calls INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Tables created before the budget spanned runs lack the column.
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(cascade_runs)")]
+            if 'llm_calls' not in columns:
+                conn.execute("ALTER TABLE cascade_runs ADD COLUMN llm_calls INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cascade_runs_job ON cascade_runs (job_id, id)")
+        _schema_ready = True
+    return conn
+
+
+def _sync_candidate_store(conn, store):
+    """Add vectors for canonical resumes registered since the last run."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumes'").fetchone():
+        return
+    store.refresh()
+    missing = [
+        fingerprint for (fingerprint,) in conn.execute("SELECT fingerprint FROM resumes WHERE id = canonical_id")
+        if fingerprint not in store
+    ]
+    for start in range(0, len(missing), 512):
+        chunk = missing[start:start + 512]
+        texts = dict(conn.execute(
+            f"SELECT fingerprint, text FROM resumes WHERE fingerprint IN ({','.join('?' * len(chunk))})", chunk
+        ).fetchall())
+        # The shared 'resumes' store already holds vectors of resumes scored before.
+        vectors = embedding_store.encode_with_store(
+            embedding_store.open_store('resumes'), [texts[fingerprint] for fingerprint in chunk]
+        )
+        store.add_many(chunk, vectors)
+
+
+def _upload_names(conn, resume_ids):
+    """Latest uploaded filename of each canonical resume's group, where there is one."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ingest_queue'").fetchone():
+        return {}
+    rows = conn.execute(
+        f"""SELECT d.canonical_id, q.filename FROM ingest_queue q JOIN resumes d ON d.id = q.resume_id
+            WHERE d.canonical_id IN ({','.join('?' * len(resume_ids))}) ORDER BY q.id""",
+        list(resume_ids)
+    ).fetchall()
+    return dict(rows)
+
+
+def llm_calls_spent(job_id, window_hours=LLM_BUDGET_WINDOW_HOURS):
+    """LLM calls the cascade has made for a job over the last `window_hours`."""
+    return _connect().execute(
+        "SELECT COALESCE(SUM(llm_calls), 0) FROM cascade_runs WHERE job_id = ? AND started_at >= ?",
+        (job_id, time.time() - window_hours * 3600)
+    ).fetchone()[0]
+
+
+def _stage(name, size_in, size_out, cutoff, seconds, **extra):
+    return {
+        'stage': name,
+        'in': size_in,
+        'out': size_out,
+        'cutoff': round(float(cutoff), 4) if cutoff is not None else None,
+        'seconds': round(seconds, 4),
+        **extra,
+    }
+
+
+def rank_candidates(job_id, prefilter_k=PREFILTER_K, rerank_k=RERANK_K, analyze_k=ANALYZE_K,
+                    llm_budget=LLM_BUDGET, backend=None):
+    """Rank stored candidates for a job through the three-stage cascade.
+
+    Returns a dict with 'candidates' (analyzed ones first, by the model's
+    overallScore, then the rest of the reranked list by total score) and a
+    'stages' report of each stage's pool sizes, cutoff score and time. The
+    report is also stored in the cascade_runs table. `llm_budget` is the
+    number of LLM calls allowed for this job over LLM_BUDGET_WINDOW_HOURS;
+    calls made or reserved by other runs in that window are deducted.
+    """
+    conn = _connect()
+    embedding_store.refresh_job_embeddings(conn, [job_id])
+    job = conn.execute("SELECT description, skills, embedding FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if job is None:
+        raise ValueError(f"No job with id {job_id}.")
+    jd_text, jd_skills, blob = job
+    started = time.time()
+    stages = []
+
+    # Stage 1: vector prefilter over every canonical resume.
+    start = time.perf_counter()
+    store = embedding_store.open_store(CANDIDATE_STORE)
+    _sync_candidate_store(conn, store)
+    job_vector = np.frombuffer(blob, dtype=np.float32)
+    hits = store.search(job_vector, k=prefilter_k) if len(store) else []
+    elapsed = time.perf_counter() - start
+    metrics.record('cascade.prefilter', elapsed, items=len(store))
+    stages.append(_stage('prefilter', len(store), len(hits), hits[-1][1] if hits else None, elapsed))
+
+    # Stage 2: hard + soft rerank of the survivors.
+    start = time.perf_counter()
+    cosines = dict(hits)
+    rows = conn.execute(
+        f"SELECT id, fingerprint, text FROM resumes WHERE id = canonical_id AND fingerprint IN ({','.join('?' * len(hits))})",
+        list(cosines)
+    ).fetchall() if hits else []
+    matches = SkillMatcher(json.loads(jd_skills or '[]')).match_many(
+        [main.parse_resume_sections(text)['skills'] for _, _, text in rows]
+    )
+    reranked = []
+    for (resume_id, fingerprint, text), match in zip(rows, matches):
+        soft_score = main.cosine_to_soft_score(cosines[fingerprint])
+        reranked.append({
+            'resume_id': resume_id,
+            'text': text,
+            'hard_score': match['score'],
+            'soft_score': soft_score,
+            'total_score': match['score'] + soft_score,
+            'matched_skills': match['matched_pairs'],
+            'analysis': None,
+        })
+    reranked.sort(key=lambda candidate: candidate['total_score'], reverse=True)
+    reranked = reranked[:rerank_k]
+    elapsed = time.perf_counter() - start
+    metrics.record('cascade.rerank', elapsed, items=len(rows))
+    stages.append(_stage(
+        'rerank', len(rows), len(reranked), reranked[-1]['total_score'] if reranked else None, elapsed
+    ))
+
+    # Stage 3: LLM analysis of the top candidates, within the call budget.
+    start = time.perf_counter()
+    top = reranked[:analyze_k]
+    error = None
+    backend = backend or processor.get_default_backend()
+    if isinstance(backend, dict):
+        error, top = backend['error'], []
+    # Reserve calls in this run's row under a write lock; the unused part is handed back below.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        remaining = max(llm_budget - llm_calls_spent(job_id), 0)
+        reserved = min(remaining, len(top))
+        run_id = conn.execute(
+            "INSERT INTO cascade_runs (job_id, started_at, report, llm_calls) VALUES (?, ?, '[]', ?)",
+            (job_id, started, reserved)
+        ).lastrowid
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    llm_calls = cached = 0
+    try:
+        for candidate in top:
+            key = processor.RESPONSE_CACHE.make_key(candidate['text'], jd_text, processor.PROMPT_VERSION, backend)
+            analysis = processor.RESPONSE_CACHE.get(key)
+            if analysis is not None:
+                cached += 1
+            elif llm_calls < reserved:
+                analysis = processor.analyze_resume(candidate['text'], jd_text, backend=backend)
+                llm_calls += 1
+            else:
+                continue
+            if 'error' not in analysis:
+                candidate['analysis'] = analysis
+    finally:
+        with conn:
+            conn.execute("UPDATE cascade_runs SET llm_calls = ? WHERE id = ?", (llm_calls, run_id))
+    analyzed = [candidate for candidate in reranked if candidate['analysis'] is not None]
+    elapsed = time.perf_counter() - start
+    metrics.record('cascade.analysis', elapsed, items=max(llm_calls, 1))
+    stages.append(_stage(
+        'analysis', len(top), len(analyzed), reranked[len(top) - 1]['total_score'] if top else None, elapsed,
+        llm_calls=llm_calls, cached=cached, llm_budget=llm_budget,
+        budget_left=remaining - llm_calls, error=error
+    ))
+
+    analyzed.sort(key=lambda candidate: candidate['analysis'].get('overallScore') or 0, reverse=True)
+    candidates = analyzed + [candidate for candidate in reranked if candidate['analysis'] is None]
+    names = _upload_names(conn, [candidate['resume_id'] for candidate in candidates]) if candidates else {}
+    for candidate in candidates:
+        candidate['filename'] = names.get(candidate['resume_id'])
+        del candidate['text']
+
+    with conn:
+        conn.execute("UPDATE cascade_runs SET report = ? WHERE id = ?", (json.dumps(stages), run_id))
+    return {'job_id': job_id, 'candidates': candidates, 'stages': stages}
+
+
+def recent_runs(job_id, limit=10):
+    """Stage reports of the latest cascade runs for a job, newest first."""
+    rows = _connect().execute(
+        "SELECT started_at, report FROM cascade_runs WHERE job_id = ? ORDER BY id DESC LIMIT ?",
+        (job_id, limit)
+    ).fetchall()
+    return [{'started_at': started_at, 'stages': json.loads(report)} for started_at, report in rows]
@@ -0,0 +1,30 @@
+import os
+import sqlite3
+import threading
+
+# --- SQLite Connections ---
+# One connection per (thread, database file), kept for the life of the thread and
+# opened in WAL mode, so readers do not block the writer and callers do not pay
+# for reopening the file. processor.py, dedup.py, score_store.py and llm.py all
+# share results.db through this.
+_local = threading.local()
+# Connections a forked child inherited; kept referenced so they are never used or closed there.
+_inherited = []
+
+
+def thread_connection(path):
+    """Return this thread's connection to `path`, opening it on first use."""
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    pid, conn = conns.get(path, (None, None))
+    if conn is not None and pid != os.getpid():
+        # SQLite connections must not cross fork(); the child opens its own.
+        _inherited.append(conn)
+        conn = None
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conns[path] = (os.getpid(), conn)
+    return conn
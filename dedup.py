@@ -0,0 +1,173 @@
+import re
+import time
+import zlib
+import hashlib
+import threading
+
+import numpy as np
+
+import db
+
+# --- Near-duplicate Detection ---
+# Resumes are fingerprinted with MinHash over word shingles of their normalized
+# text. Signatures are split into LSH bands stored in SQLite, so looking up a new
+# resume only compares it with resumes that share at least one band bucket
+# instead of with every stored resume.
+NUM_PERM = 128
+BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a bucket.
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.85
+TOKEN_RE = re.compile(r'[a-z0-9+#]+')
+
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+
+def normalize(text):
+    """Lowercased word tokens; extractor whitespace and punctuation differences drop out."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def fingerprint(text):
+    """Exact-content fingerprint of the normalized text."""
+    return hashlib.sha256(" ".join(normalize(text)).encode('utf-8')).hexdigest()
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM uint64 values) of the text's word shingles."""
+    tokens = normalize(text)
+    shingles = {
+        " ".join(tokens[i:i + SHINGLE_SIZE])
+        for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+    }
+    hashes = np.array([zlib.crc32(s.encode('utf-8')) for s in shingles], dtype=np.uint64)
+    return ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+
+def _band_buckets(signature):
+    rows = NUM_PERM // BANDS
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+class DuplicateIndex:
+    """Registry of seen resumes that maps near-duplicates to one canonical resume.
+
+    The first resume of a group is its canonical entry; later uploads whose
+    estimated similarity to a stored resume is at least `threshold` point at the
+    same canonical entry, so its cached scores and analyses can be reused.
+    """
+
+    def __init__(self, db_path, threshold=DUPLICATE_THRESHOLD):
+        self.db_path = db_path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        conn = db.thread_connection(self.db_path)
+        if not self._ready:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS resumes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fingerprint TEXT NOT NULL UNIQUE,
+                    canonical_id INTEGER NOT NULL,
+                    signature BLOB NOT NULL,
+                    text TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS resume_lsh (
+                    bucket TEXT NOT NULL,
+                    resume_id INTEGER NOT NULL,
+                    PRIMARY KEY (bucket, resume_id)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resumes_canonical ON resumes (canonical_id)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _entry(self, conn, resume_id, similarity_score, duplicate):
+        canonical_id, canonical_fingerprint, text = conn.execute(
+            """SELECT c.id, c.fingerprint, c.text FROM resumes r JOIN resumes c ON c.id = r.canonical_id
+               WHERE r.id = ?""",
+            (resume_id,)
+        ).fetchone()
+        return {
+            'id': resume_id,
+            'canonical_id': canonical_id,
+            'canonical_fingerprint': canonical_fingerprint,
+            'canonical_text': text,
+            'similarity': similarity_score,
+            'duplicate': duplicate,
+        }
+
+    def _exact(self, conn, text_fingerprint):
+        row = conn.execute("SELECT id FROM resumes WHERE fingerprint = ?", (text_fingerprint,)).fetchone()
+        return row[0] if row else None
+
+    def _similar(self, conn, signature):
+        # Only resumes sharing at least one band bucket are compared.
+        buckets = _band_buckets(signature)
+        candidates = conn.execute(
+            f"""SELECT id, signature FROM resumes WHERE id IN (
+                    SELECT resume_id FROM resume_lsh WHERE bucket IN ({",".join("?" * len(buckets))})
+                )""",
+            buckets
+        ).fetchall()
+        best = None
+        for resume_id, blob in candidates:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint64))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (resume_id, score)
+        return best
+
+    def register(self, text):
+        """Record a resume and resolve it to its canonical entry.
+
+        Returns a dict with the resume's 'id', its group's 'canonical_id',
+        'canonical_fingerprint' and 'canonical_text', the 'similarity' to the
+        matched resume and whether it was a 'duplicate' of one already stored.
+        """
+        text_fingerprint = fingerprint(text)
+        with self._lock:
+            conn = self._connect()
+            exact = self._exact(conn, text_fingerprint)
+            if exact is not None:
+                return self._entry(conn, exact, 1.0, True)
+
+            signature = minhash(text)
+            match = self._similar(conn, signature)
+            with conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO resumes (fingerprint, canonical_id, signature, text, created) VALUES (?, 0, ?, ?, ?)",
+                    (text_fingerprint, signature.tobytes(), text, time.time())
+                )
+                if cursor.rowcount == 0:
+                    # Another process registered the same text first.
+                    resume_id, match = self._exact(conn, text_fingerprint), (None, 1.0)
+                else:
+                    resume_id = cursor.lastrowid
+                    if match is not None:
+                        canonical_id = conn.execute(
+                            "SELECT canonical_id FROM resumes WHERE id = ?", (match[0],)
+                        ).fetchone()[0]
+                    else:
+                        canonical_id = resume_id
+                    conn.execute("UPDATE resumes SET canonical_id = ? WHERE id = ?", (canonical_id, resume_id))
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO resume_lsh (bucket, resume_id) VALUES (?, ?)",
+                        [(bucket, resume_id) for bucket in _band_buckets(signature)]
+                    )
+            return self._entry(conn, resume_id, match[1] if match else None, match is not None)
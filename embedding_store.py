@@ -0,0 +1,282 @@
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process.
+    fcntl = None
+
+import encoder
+
+# --- Embedding Store ---
+# Append-only file of fixed-width quantized vectors, read through np.memmap so
+# several worker processes share one copy via the OS page cache. Rows are
+# float16, or int8 with a per-vector float32 scale (about 4x smaller than float32).
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'embeddings')
+SEARCH_CHUNK_ROWS = 65536
+
+
+def _record_dtype(dim, dtype):
+    if dtype == 'float16':
+        return np.dtype([('vector', '<f2', (dim,))])
+    if dtype == 'int8':
+        return np.dtype([('scale', '<f4'), ('vector', 'i1', (dim,))])
+    raise ValueError("dtype must be 'float16' or 'int8'.")
+
+
+def text_key(text):
+    """Content id for a text, so identical documents share one stored vector."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only, memory-mapped store of quantized embeddings keyed by id.
+
+    Files: <path>.vec holds the records, <path>.ids one id per line (line number
+    is the row), <path>.meta.json the dimension and dtype. Re-adding an id
+    appends a new row that supersedes the old one. Appends from several
+    processes are serialized with a lock file.
+    """
+
+    def __init__(self, path, dim=384, dtype='float16'):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        meta_path = path + '.meta.json'
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            dim, dtype = meta['dim'], meta['dtype']
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump({'dim': dim, 'dtype': dtype}, f)
+        self.dim = dim
+        self.dtype = dtype
+        self._record = _record_dtype(dim, dtype)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._ids_offset = 0
+        self._mmap = None
+        # The id index is three arrays, not a dict, so millions of ids cost about
+        # (id length + 9) bytes each: row -> id as fixed-width bytes (grown by
+        # doubling), every row sorted stably by (id, row) so a binary search lands
+        # on an id's latest row, and a mask of rows not superseded by a later add.
+        # Readers take the tuple once; refresh() swaps in a new one.
+        self._buffer = np.zeros(0, dtype='S1')
+        self._view = (0, self._buffer, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), 0)
+        self.refresh()
+
+    @property
+    def _rows(self):
+        return self._view[0]
+
+    def __len__(self):
+        return self._view[4]
+
+    def __contains__(self, item_id):
+        return self._lookup([item_id])[0] >= 0
+
+    @staticmethod
+    def _encode_ids(ids):
+        return np.array([item_id.encode('utf-8') for item_id in ids], dtype=bytes)
+
+    def _lookup(self, ids, view=None):
+        """Latest row of each id, or -1 for ids not in the store."""
+        rows, row_ids, order, _, _ = view or self._view
+        keys = self._encode_ids(ids)
+        if rows == 0 or not len(keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        row_ids = row_ids[:rows]
+        pos = np.searchsorted(row_ids, keys, side='right', sorter=order) - 1
+        found = order[np.maximum(pos, 0)]
+        return np.where((pos >= 0) & (row_ids[found] == keys), found, -1)
+
+    def refresh(self):
+        """Pick up ids appended by other processes since the store was opened."""
+        if not os.path.exists(self.path + '.ids'):
+            return
+        with self._refresh_lock:
+            with open(self.path + '.ids', 'rb') as f:
+                f.seek(self._ids_offset)
+                data = f.read()
+            # Only complete lines count; a partial last line is still being written.
+            data = data[:data.rfind(b'\n') + 1]
+            if not data:
+                return
+            new_ids = data.decode('utf-8').splitlines()
+            view = self._view
+            rows, _, order, live, _ = view
+            keys = self._encode_ids(new_ids)
+            new_rows = np.arange(rows, rows + len(keys))
+
+            # Rows added earlier, or earlier in this batch, for the same id are superseded.
+            live = np.concatenate([live, np.ones(len(keys), dtype=bool)])
+            previous = self._lookup(new_ids, view)
+            live[previous[previous >= 0]] = False
+            batch_order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[batch_order]
+            live[new_rows[batch_order[:-1][sorted_keys[:-1] == sorted_keys[1:]]]] = False
+
+            buffer = self._buffer
+            if keys.dtype.itemsize > buffer.dtype.itemsize:
+                buffer = buffer.astype(keys.dtype)
+            positions = np.searchsorted(buffer[:rows], sorted_keys, side='right', sorter=order)
+            order = np.insert(order, positions, new_rows[batch_order])
+            if len(buffer) < rows + len(keys):
+                grown = np.zeros(max(2 * len(buffer), rows + len(keys)), dtype=buffer.dtype)
+                grown[:rows] = buffer[:rows]
+                buffer = grown
+            buffer[rows:rows + len(keys)] = keys
+
+            self._buffer = buffer
+            self._view = (rows + len(keys), buffer, order, live, int(np.count_nonzero(live)))
+            self._ids_offset += len(data)
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock, open(self.path + '.lock', 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    # --- Writing ---
+    def _quantize(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        records = np.zeros(len(vectors), dtype=self._record)
+        if self.dtype == 'float16':
+            records['vector'] = vectors.astype(np.float16)
+        else:
+            scale = np.abs(vectors).max(axis=1) / 127
+            scale[scale == 0] = 1
+            records['scale'] = scale
+            records['vector'] = np.clip(np.rint(vectors / scale[:, None]), -127, 127).astype(np.int8)
+        return records
+
+    def add_many(self, ids, vectors):
+        """Append vectors for `ids` (a later add of the same id wins)."""
+        ids = list(ids)
+        if not ids:
+            return
+        records = self._quantize(vectors)
+        with self._write_lock():
+            self.refresh()
+            with open(self.path + '.vec', 'ab') as f:
+                # Drop vector rows whose ids never got written (a crash between the two appends).
+                f.truncate(self._rows * self._record.itemsize)
+                f.write(records.tobytes())
+            with open(self.path + '.ids', 'ab') as f:
+                f.truncate(self._ids_offset)
+                f.write(''.join(f"{item_id}\n" for item_id in ids).encode('utf-8'))
+            self.refresh()
+            self._mmap = None
+
+    def add(self, item_id, vector):
+        self.add_many([item_id], [vector])
+
+    # --- Reading ---
+    def _records(self):
+        if self._mmap is None or len(self._mmap) != self._rows:
+            if self._rows == 0:
+                return np.zeros(0, dtype=self._record)
+            self._mmap = np.memmap(self.path + '.vec', dtype=self._record, mode='r', shape=(self._rows,))
+        return self._mmap
+
+    def _dequantize(self, records):
+        vectors = records['vector'].astype(np.float32)
+        if self.dtype == 'int8':
+            vectors *= records['scale'][:, None]
+        return vectors
+
+    def get_many(self, ids):
+        """Return a float32 (len(ids), dim) array; raises KeyError for unknown ids."""
+        ids = list(ids)
+        rows = self._lookup(ids)
+        if (rows < 0).any():
+            raise KeyError(ids[int(np.argmax(rows < 0))])
+        return self._dequantize(self._records()[rows])
+
+    def get(self, item_id):
+        return self.get_many([item_id])[0]
+
+    def search(self, query, k=10, chunk_rows=SEARCH_CHUNK_ROWS):
+        """Brute-force top-k by dot product, scanning the memory map chunk by chunk.
+
+        Returns [(id, score)] best first. With normalized vectors the score is the
+        cosine similarity.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        total, row_ids, _, live, _ = self._view
+        records = self._records()[:total]
+
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, total, chunk_rows):
+            chunk = records[start:start + chunk_rows]
+            if self.dtype == 'int8':
+                scores = (chunk['vector'].astype(np.float32) @ query) * chunk['scale']
+            else:
+                scores = chunk['vector'].astype(np.float32) @ query
+            # Rows superseded by a later add of the same id are skipped.
+            scores[~live[start:start + len(chunk)]] = -np.inf
+            rows = np.arange(start, start + len(chunk))
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        order = np.argsort(-best_scores)
+        return [
+            (row_ids[best_rows[i]].decode('utf-8'), float(best_scores[i]))
+            for i in order if np.isfinite(best_scores[i])
+        ]
+
+
+_stores = {}
+
+
+def open_store(name, dim=384, dtype='float16'):
+    """Open (or create) a named store under embeddings/<model>/, shared within the process."""
+    path = os.path.join(STORE_DIR, encoder.model_id().replace('/', '__'), name)
+    if path not in _stores:
+        _stores[path] = EmbeddingStore(path, dim=dim, dtype=dtype)
+    return _stores[path]
+
+
+def refresh_job_embeddings(conn, job_ids=None):
+    """Embed, in one batch, jobs whose stored vector is missing or from another model.
+
+    JD vectors live in the jobs table (see processor.py) next to the id of the
+    model that produced them, so switching encoders re-embeds them instead of
+    comparing vectors from different models. Returns how many were embedded.
+    """
+    model = encoder.model_id()
+    query = "SELECT id, description FROM jobs WHERE (embedding IS NULL OR embedding_model IS NOT ?)"
+    params = [model]
+    if job_ids is not None:
+        query += f" AND id IN ({','.join('?' * len(job_ids))})"
+        params += list(job_ids)
+    rows = conn.execute(query, params).fetchall()
+    if not rows:
+        return 0
+    embeddings = encoder.encode([description for _, description in rows])
+    with conn:
+        conn.executemany(
+            "UPDATE jobs SET embedding = ?, embedding_model = ? WHERE id = ?",
+            [(np.asarray(embedding, dtype=np.float32).tobytes(), model, job_id)
+             for (job_id, _), embedding in zip(rows, embeddings)]
+        )
+    return len(rows)
+
+
+def encode_with_store(store, texts):
+    """Embed texts, reusing stored vectors and encoding only the missing ones in one batch."""
+    keys = [text_key(text) for text in texts]
+    missing = list({key: text for key, text in zip(keys, texts) if key not in store}.items())
+    if missing:
+        store.add_many([key for key, _ in missing], encoder.encode([text for _, text in missing]))
+    return store.get_many(keys)
@@ -0,0 +1,211 @@
+import os
+import re
+import zlib
+import threading
+
+import numpy as np
+
+import metrics
+
+# --- Shared Embedding Model ---
+# One SentenceTransformer per process. It is loaded on first use and then reused
+# by the CLI, batch jobs and the Streamlit pages (module state survives reruns).
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# --- CPU Inference Settings ---
+# 'fp32' is the stock model; 'int8' applies torch dynamic quantization to its
+# Linear layers (CPU only). 0 threads keeps torch's default intra-op thread count.
+# Texts are grouped by length into batches of about TOKENS_PER_BATCH padded
+# tokens, so short texts are not padded to the length of long ones.
+BACKENDS = ('fp32', 'int8')
+BACKEND = os.environ.get('HIRESIGHT_ENCODER_BACKEND', 'fp32')
+TORCH_THREADS = int(os.environ.get('HIRESIGHT_TORCH_THREADS', '0'))
+TOKENS_PER_BATCH = int(os.environ.get('HIRESIGHT_TOKENS_PER_BATCH', '8192'))
+MAX_SEQ_TOKENS = 256  # all-MiniLM-L6-v2 truncates inputs beyond this.
+# With a scoring service URL (see scoring_service.py), embeddings are requested
+# from that service and torch is never loaded in this process.
+SCORING_URL = os.environ.get('HIRESIGHT_SCORING_URL')
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_model(backend=BACKEND, threads=TORCH_THREADS):
+    """Build a new SentenceTransformer for the given backend and thread count."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Use one of {BACKENDS}.")
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if threads:
+        torch.set_num_threads(threads)
+    if backend == 'fp32':
+        return SentenceTransformer(MODEL_NAME)
+    model = SentenceTransformer(MODEL_NAME, device='cpu')
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def model_id():
+    """Identifies the vectors the shared model produces, for caches of embeddings."""
+    model = _model if _model is not None or not SCORING_URL else get_model()
+    if hasattr(model, 'model_id'):
+        return model.model_id
+    return MODEL_NAME if BACKEND == 'fp32' else f"{MODEL_NAME}-{BACKEND}"
+
+
+def get_model():
+    """Return the process-wide embedding model, loading it on first call."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = RemoteModel(SCORING_URL) if SCORING_URL else load_model()
+    return _model
+
+
+_warm_up_thread = None
+
+
+def warm_up(background=True):
+    """Load the model ahead of the first request.
+
+    With `background`, loading happens in a daemon thread so app start-up is not
+    blocked; repeated calls (e.g. on every Streamlit rerun) are no-ops.
+    """
+    global _warm_up_thread
+    if _model is not None:
+        return
+    if not background:
+        get_model()
+        return
+    with _model_lock:
+        if _warm_up_thread is not None:
+            return
+        _warm_up_thread = threading.Thread(target=get_model, name='encoder-warm-up', daemon=True)
+    _warm_up_thread.start()
+
+
+def set_model(model):
+    """Replace the shared model (any object with a SentenceTransformer-style encode)."""
+    global _model
+    with _model_lock:
+        _model = model
+
+
+def _approx_tokens(text):
+    # About four characters per word piece for English text, plus [CLS]/[SEP].
+    return min(len(text) // 4 + 2, MAX_SEQ_TOKENS)
+
+
+def length_batches(texts, tokens_per_batch=TOKENS_PER_BATCH):
+    """Group text indices by length into batches of at most ~tokens_per_batch padded tokens."""
+    batches = []
+    batch = []
+    for i in sorted(range(len(texts)), key=lambda i: _approx_tokens(texts[i])):
+        # Sorted ascending, so the current text is the longest in its batch.
+        if batch and _approx_tokens(texts[i]) * (len(batch) + 1) > tokens_per_batch:
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def encode(texts, model=None, tokens_per_batch=TOKENS_PER_BATCH):
+    """Encode texts in length-bucketed batches.
+
+    Returns a float32 array of shape (len(texts), dim), in input order, with
+    L2-normalized rows, so cosine similarity is a plain dot product. `model`
+    defaults to the shared model.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    model = model or get_model()
+    embeddings = None
+    # The scoring service buckets on its side, so remote calls send everything at once.
+    batches = [list(range(len(texts)))] if isinstance(model, RemoteModel) else length_batches(texts, tokens_per_batch)
+    with metrics.timed('embed', items=len(texts)):
+        for batch in batches:
+            vectors = np.asarray(model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            ), dtype=np.float32)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            embeddings[batch] = vectors
+    return embeddings
+
+
+def cosine_matrix(a, b):
+    """Cosine similarity between every row of `a` and every row of `b`."""
+    return a @ b.T
+
+
+class RemoteModel:
+    """Client for a scoring service's /embed endpoint, with a SentenceTransformer-style encode.
+
+    Requests rejected with 503 (the service's queue is full) are retried with
+    exponential backoff.
+    """
+
+    def __init__(self, url, timeout=60, retries=5, backoff=0.2):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._model_id = None
+
+    def _request(self, path, payload=None):
+        import json
+        import time
+        import urllib.error
+        import urllib.request
+        data = None if payload is None else json.dumps(payload).encode('utf-8')
+        for attempt in range(self.retries + 1):
+            request = urllib.request.Request(
+                self.url + path, data=data, headers={'Content-Type': 'application/json'}
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                if e.code != 503 or attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    @property
+    def model_id(self):
+        if self._model_id is None:
+            self._model_id = self._request('/health')['model']
+        return self._model_id
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True, **kwargs):
+        # The service always returns L2-normalized rows.
+        embeddings = self._request('/embed', {'texts': list(texts)})['embeddings']
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class StubModel:
+    """Offline stand-in for the SentenceTransformer.
+
+    Hashes word tokens into a fixed-size vector, so similar texts still get
+    similar embeddings. Deterministic and fast; for benchmarks, tests and
+    machines without the model weights. Install with set_model(StubModel()).
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.model_id = f"stub-{dim}"
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False, **kwargs):
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r'\w+', text.lower()):
+                embeddings[row, zlib.crc32(token.encode('utf-8')) % self.dim] += 1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms == 0, 1, norms)
+        return embeddings
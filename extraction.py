@@ -0,0 +1,152 @@
+import io
+import os
+import re
+import time
+import threading
+
+# --- Shared Document Extraction ---
+# One extractor for main.py, processor.py, resume_parser.py and ingest.py. PDF
+# pages are read lazily from pdfium's text layer, which is far cheaper than
+# pdfplumber's layout analysis; pdfplumber is only used for pages whose fast
+# output looks broken. Pages are collected in a list and joined once, and every
+# document is bounded by page, byte and time limits, so a malformed upload
+# cannot stall a worker or exhaust its memory.
+MAX_PAGES = int(os.environ.get('HIRESIGHT_MAX_PAGES', '50'))
+MAX_TEXT_BYTES = int(os.environ.get('HIRESIGHT_MAX_TEXT_KB', '1024')) * 1024
+MAX_SECONDS = float(os.environ.get('HIRESIGHT_MAX_EXTRACT_SECONDS', '30'))
+MIN_PAGE_CHARS = 20
+
+HEADER_FOOTER_RE = re.compile(r'^\s*Page \d+\s*|\s*-\s*Page \d+\s*$', re.MULTILINE)
+
+# pdfium is not thread-safe; Streamlit sessions extract from separate threads.
+_pdfium_lock = threading.Lock()
+
+
+def _looks_poor(text):
+    """True when fast text-layer output is empty, unmapped glyphs, or words run together."""
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return True
+    if '(cid:' in stripped or stripped.count('�') > len(stripped) * 0.01:
+        return True
+    letters = sum(ch.isalpha() for ch in stripped)
+    spaces = sum(ch.isspace() for ch in stripped)
+    return letters < len(stripped) * 0.5 or spaces < len(stripped) * 0.05
+
+
+def _as_source(source):
+    """Paths are passed through; uploaded file objects are read into bytes once."""
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    return source.getvalue() if hasattr(source, 'getvalue') else source.read()
+
+
+def _note(truncated, reason):
+    if truncated is not None:
+        truncated.add(reason)
+
+
+def pdf_page_count(source):
+    import pypdfium2 as pdfium
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(_as_source(source))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def iter_pdf_pages(source, start=0, stop=None, strip_headers=False, deadline=None, truncated=None):
+    """Yield the text of pages [start, stop) one at a time.
+
+    Stops early at MAX_PAGES or once `deadline` (a time.monotonic() value) has
+    passed; when it does and `truncated` (a set) is given, 'pages' or 'time' is
+    added to it. Pages whose text layer looks poor are re-extracted with pdfplumber.
+    """
+    import pypdfium2 as pdfium
+    source = _as_source(source)
+    plumber = None
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(source)
+    try:
+        stop = len(pdf) if stop is None else stop
+        if stop > MAX_PAGES:
+            stop = MAX_PAGES
+            _note(truncated, 'pages')
+        for index in range(start, stop):
+            if deadline is not None and time.monotonic() > deadline:
+                _note(truncated, 'time')
+                break
+            with _pdfium_lock:
+                page = pdf[index]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range().replace('\r\n', '\n')
+                textpage.close()
+                page.close()
+            if _looks_poor(text):
+                if plumber is None:
+                    import pdfplumber
+                    plumber = pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+                plumber_page = plumber.pages[index]
+                text = plumber_page.extract_text() or ""
+                plumber_page.close()  # Drop the page's cached layout objects as we go.
+            if strip_headers:
+                text = HEADER_FOOTER_RE.sub('', text)
+            yield text
+    finally:
+        if plumber is not None:
+            plumber.close()
+        with _pdfium_lock:
+            pdf.close()
+
+
+def iter_docx_blocks(source):
+    """Yield paragraph and table-cell text of a DOCX document in order."""
+    from docx import Document
+    source = _as_source(source)
+    doc = Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+    for para in doc.paragraphs:
+        yield para.text
+    for table in doc.tables:
+        for row in table.rows:
+            yield " | ".join(cell.text for cell in row.cells)
+
+
+def join_limited(parts, separator="\n", max_bytes=MAX_TEXT_BYTES, truncated=None):
+    """Join text parts once, stopping after `max_bytes` characters of output.
+
+    When output is cut and `truncated` (a set) is given, 'bytes' is added to it.
+    """
+    kept = []
+    size = 0
+    for part in parts:
+        if kept:
+            size += len(separator)
+        if size + len(part) > max_bytes:
+            remaining = max_bytes - size
+            if remaining > 0:
+                kept.append(part[:remaining])
+            _note(truncated, 'bytes')
+            break
+        kept.append(part)
+        size += len(part)
+    return separator.join(kept)
+
+
+def extract_text(source, ext=None, strip_headers=False, max_seconds=MAX_SECONDS, truncated=None):
+    """Extract the text of a PDF or DOCX file path or uploaded file object.
+
+    `ext` defaults to the path's (or upload's name's) extension. Output is
+    bounded by MAX_PAGES, MAX_TEXT_BYTES and `max_seconds`; the limits that cut
+    it short ('pages', 'bytes', 'time') are added to the `truncated` set if given.
+    """
+    if ext is None:
+        ext = os.path.splitext(source if isinstance(source, str) else getattr(source, 'name', ''))[1]
+    ext = ext.lower()
+    if ext == '.pdf':
+        deadline = time.monotonic() + max_seconds
+        pages = iter_pdf_pages(source, strip_headers=strip_headers, deadline=deadline, truncated=truncated)
+        return join_limited(pages, truncated=truncated)
+    if ext == '.docx':
+        return join_limited(iter_docx_blocks(source), truncated=truncated)
+    raise ValueError("Unsupported file format. Use PDF or DOCX.")
@@ -0,0 +1,121 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import extraction
+import metrics
+import text_cache
+
+# --- Parallel Ingestion ---
+# Extraction is CPU-bound, so documents are extracted in a process pool. Long PDFs
+# are split into page ranges that run on different workers and are stitched back
+# together in page order. Page, byte and time limits come from extraction.py.
+# A document's MAX_SECONDS is split between its chunks by page count, and each
+# chunk's share starts when a worker picks it up, so time spent waiting in the
+# pool behind other documents does not count against it.
+PAGES_PER_TASK = 8
+
+
+def _extract_pdf_pages(path, start, stop, strip_headers, max_seconds):
+    """Extract text for pages [start, stop) of a PDF (runs in a worker process).
+
+    Returns (page texts, limits that cut the chunk short).
+    """
+    truncated = set()
+    deadline = time.monotonic() + max_seconds
+    texts = list(extraction.iter_pdf_pages(path, start, stop, strip_headers, deadline=deadline, truncated=truncated))
+    return texts, truncated
+
+
+def _extract_docx(path):
+    truncated = set()
+    return [extraction.join_limited(extraction.iter_docx_blocks(path), truncated=truncated)], truncated
+
+
+def _finish(texts, normalize, truncated):
+    text = extraction.join_limited(texts, truncated=truncated)
+    if normalize:
+        return re.sub(r'\s+', ' ', text).strip()
+    return text.strip()
+
+
+def extract_many(paths, max_workers=None, pages_per_task=PAGES_PER_TASK, strip_headers=False,
+                 normalize=True, cache_namespace=None, cache_version=None):
+    """Extract text from many PDF/DOCX files in parallel.
+
+    Returns one dict per input path, in input order, with keys 'path', 'text',
+    'error' and 'truncated' (the sorted names of the page, byte or time limits
+    that cut the text short; empty when it is complete). A file that fails to
+    open or parse gets its error recorded and does not affect the rest of the
+    batch. When `cache_namespace` is given, results are read from and written to
+    text_cache under that namespace and `cache_version`; truncated text is not
+    cached, so the next run tries the file again.
+    """
+    results = [{'path': path, 'text': None, 'error': None, 'truncated': []} for path in paths]
+    keys = {}
+    pending = []
+    for i, path in enumerate(paths):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in ('.pdf', '.docx'):
+            results[i]['error'] = "Unsupported format. Use PDF or DOCX."
+            continue
+        if cache_namespace is not None:
+            try:
+                with open(path, 'rb') as f:
+                    keys[i] = text_cache.make_key(f.read(), cache_namespace, cache_version)
+            except OSError as e:
+                results[i]['error'] = str(e)
+                continue
+            cached_text = text_cache.get(keys[i])
+            metrics.record_cache('text_cache', cached_text is not None)
+            if cached_text is not None:
+                results[i]['text'] = cached_text
+                continue
+        pending.append(i)
+
+    if not pending:
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        # Page counts first, so long PDFs can be split across workers.
+        counts = {
+            i: pool.submit(extraction.pdf_page_count, paths[i])
+            for i in pending if paths[i].lower().endswith('.pdf')
+        }
+        chunks = {}
+        truncated = {i: set() for i in pending}
+        for i in pending:
+            if i not in counts:
+                chunks[i] = [pool.submit(_extract_docx, paths[i])]
+                continue
+            try:
+                page_count = counts[i].result()
+            except Exception as e:
+                results[i]['error'] = f"Could not open PDF: {e}"
+                continue
+            if page_count > extraction.MAX_PAGES:
+                page_count = extraction.MAX_PAGES
+                truncated[i].add('pages')
+            chunks[i] = []
+            for start in range(0, page_count, pages_per_task):
+                stop = min(start + pages_per_task, page_count)
+                max_seconds = extraction.MAX_SECONDS * (stop - start) / page_count
+                chunks[i].append(pool.submit(_extract_pdf_pages, paths[i], start, stop, strip_headers, max_seconds))
+
+        for i, futures in chunks.items():
+            texts = []
+            try:
+                for future in futures:
+                    chunk_texts, chunk_truncated = future.result()
+                    texts.extend(chunk_texts)
+                    truncated[i] |= chunk_truncated
+            except Exception as e:
+                results[i]['error'] = f"Extraction failed: {e}"
+                continue
+            results[i]['text'] = _finish(texts, normalize, truncated[i])
+            results[i]['truncated'] = sorted(truncated[i])
+            if i in keys and not truncated[i]:
+                text_cache.put(keys[i], results[i]['text'])
+
+    return results
@@ -0,0 +1,327 @@
+import os
+import io
+import sys
+import json
+import time
+import uuid
+import zipfile
+import argparse
+import subprocess
+import contextlib
+import multiprocessing
+
+try:
+    import fcntl
+except ImportError:  # Windows: pools are not deduplicated.
+    fcntl = None
+
+import main
+import metrics
+import processor
+
+# --- Bulk Ingestion Queue ---
+# Uploaded resumes are saved under uploads/<batch_id>/ and queued in the
+# ingest_queue table of results.db. Worker processes (python job_queue.py) claim
+# rows one at a time, extract and score them against the batch's JDs, and store
+# the result on the row, so the Streamlit request only has to write files.
+UPLOAD_DIR = os.path.join(processor.PROJECT_ROOT, 'uploads')
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+MAX_ATTEMPTS = 3
+CLAIM_TIMEOUT_SECONDS = 600  # A row claimed longer ago than this belongs to a dead worker.
+POLL_SECONDS = 1.0
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+# Held by the running worker pool, so at most one pool (each loading its own model) runs at a time.
+POOL_LOCK_PATH = os.path.join(UPLOAD_DIR, '.workers.lock')
+
+_schema_ready = False
+
+
+def _connect():
+    global _schema_ready
+    conn = processor.get_connection()
+    if not _schema_ready:
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    batch_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    job_ids TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    claimed_at REAL,
+                    finished_at REAL,
+                    resume_id INTEGER,
+                    duplicate_of INTEGER
+                )
+            """)
+            # Queues created before near-duplicate detection lack these columns.
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(ingest_queue)")]
+            for column in ('resume_id', 'duplicate_of'):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE ingest_queue ADD COLUMN {column} INTEGER")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_queue_resume ON ingest_queue (resume_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_queue_status ON ingest_queue (status, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_queue_batch ON ingest_queue (batch_id, id)")
+        _schema_ready = True
+    return conn
+
+
+# --- Enqueueing ---
+def _expand_upload(name, data):
+    """Yield (filename, bytes) for a resume upload, unpacking zip archives."""
+    if name.lower().endswith('.zip'):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for member in archive.infolist():
+                # Only the base name is kept, so archive paths cannot escape the batch folder.
+                member_name = os.path.basename(member.filename)
+                if member.is_dir() or member_name.startswith('.'):
+                    continue
+                if member_name.lower().endswith(RESUME_EXTENSIONS):
+                    yield member_name, archive.read(member)
+    elif name.lower().endswith(RESUME_EXTENSIONS):
+        yield os.path.basename(name), data
+
+
+def enqueue_uploads(uploads, job_ids):
+    """Save uploaded resumes and queue them for scoring against `job_ids`.
+
+    `uploads` is a list of (filename, bytes); zip archives are unpacked. Returns
+    (batch_id, number of files queued).
+    """
+    batch_id = time.strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+    batch_dir = os.path.join(UPLOAD_DIR, batch_id)
+    os.makedirs(batch_dir, exist_ok=True)
+
+    rows = []
+    for name, data in uploads:
+        for filename, content in _expand_upload(name, data):
+            # Prefix with the queue position so equal names from different folders don't collide.
+            path = os.path.join(batch_dir, f"{len(rows):05d}_{filename}")
+            with open(path, 'wb') as f:
+                f.write(content)
+            rows.append((batch_id, filename, path, json.dumps(list(job_ids)), time.time()))
+
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO ingest_queue (batch_id, filename, path, job_ids, created_at) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+    return batch_id, len(rows)
+
+
+@contextlib.contextmanager
+def _pool_lock():
+    """Yield True while holding the pool lock, or False if another pool holds it."""
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    with open(POOL_LOCK_PATH, 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+
+
+def pool_running():
+    with _pool_lock() as acquired:
+        return not acquired
+
+
+def start_workers(workers=DEFAULT_WORKERS):
+    """Launch a detached worker pool unless one is already running; it exits once the queue is empty.
+
+    Returns the new process, or None if a running pool will pick up the work.
+    """
+    if pool_running():
+        return None
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--workers', str(workers)],
+        cwd=processor.PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+# --- Workers ---
+def claim_next():
+    """Atomically mark the oldest runnable row as running and return it, or None."""
+    conn = _connect()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # A row whose worker died on every attempt (e.g. a file that crashes the extractor) is given up on.
+        conn.execute(
+            """UPDATE ingest_queue SET status = 'failed', finished_at = ?,
+                   error = 'The worker stopped while processing this file.'
+               WHERE status = 'running' AND claimed_at < ? AND attempts >= ?""",
+            (now, now - CLAIM_TIMEOUT_SECONDS, MAX_ATTEMPTS)
+        )
+        row = conn.execute(
+            """SELECT id, filename, path, job_ids FROM ingest_queue
+               WHERE status = 'queued' OR (status = 'running' AND claimed_at < ? AND attempts < ?)
+               ORDER BY id LIMIT 1""",
+            (now - CLAIM_TIMEOUT_SECONDS, MAX_ATTEMPTS)
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE ingest_queue SET status = 'running', attempts = attempts + 1, claimed_at = ? WHERE id = ?",
+                (now, row[0])
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if row is None:
+        return None
+    return {'id': row[0], 'filename': row[1], 'path': row[2], 'job_ids': json.loads(row[3])}
+
+
+def process_item(item):
+    """Score a claimed row and record the outcome; failures are retried up to MAX_ATTEMPTS.
+
+    Scores come from the materialized scores table (see score_store.py): only
+    the batch's jobs are scored here (the app's background materializer fills
+    in the other pairs), and a near-duplicate of an already scored resume
+    reuses its scores.
+    """
+    conn = _connect()
+    try:
+        resume_text = main.extract_resume_text(item['path'])
+        duplicate = processor.DUPLICATE_INDEX.register(resume_text)
+        metrics.record_cache('near_duplicate', duplicate['duplicate'])
+        with metrics.timed('queue.score_resume', items=len(item['job_ids'])):
+            scores = processor.SCORE_STORE.scores_for(duplicate['canonical_fingerprint'], item['job_ids'])
+    except Exception as e:
+        attempts = conn.execute("SELECT attempts FROM ingest_queue WHERE id = ?", (item['id'],)).fetchone()[0]
+        status = 'failed' if attempts >= MAX_ATTEMPTS else 'queued'
+        with conn:
+            conn.execute(
+                "UPDATE ingest_queue SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, f"{type(e).__name__}: {e}", time.time(), item['id'])
+            )
+        return False
+    with conn:
+        conn.execute(
+            """UPDATE ingest_queue SET status = 'done', error = NULL, result = ?, finished_at = ?,
+                   resume_id = ?, duplicate_of = ? WHERE id = ?""",
+            (
+                json.dumps(scores), time.time(), duplicate['id'],
+                duplicate['canonical_id'] if duplicate['duplicate'] else None, item['id']
+            )
+        )
+    return True
+
+
+def run_worker(exit_when_idle=True):
+    """Process queued rows until the queue is empty (or forever)."""
+    while True:
+        item = claim_next()
+        if item is None:
+            if exit_when_idle:
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+        process_item(item)
+    metrics.flush()
+
+
+def _has_runnable():
+    return _connect().execute(
+        "SELECT 1 FROM ingest_queue WHERE status = 'queued' OR (status = 'running' AND claimed_at < ?) LIMIT 1",
+        (time.time() - CLAIM_TIMEOUT_SECONDS,)
+    ).fetchone() is not None
+
+
+def run_pool(workers=DEFAULT_WORKERS, exit_when_idle=True):
+    """Run worker processes while holding the pool lock; returns at once if another pool runs.
+
+    Workers are spawned rather than forked, so they share no SQLite connection or
+    other process state with this one (which reads the queue between rounds).
+    """
+    context = multiprocessing.get_context('spawn')
+    while True:
+        with _pool_lock() as acquired:
+            if not acquired:
+                return
+            processes = [
+                context.Process(target=run_worker, args=(exit_when_idle,))
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+        # Rows queued while the workers were exiting saw the lock held and started no pool.
+        if not _has_runnable():
+            return
+
+
+# --- Progress ---
+def list_batches(limit=20):
+    """Most recent batches with per-status file counts."""
+    rows = _connect().execute(
+        """SELECT batch_id, MIN(created_at), COUNT(*),
+                  SUM(status = 'queued'), SUM(status = 'running'), SUM(status = 'done'), SUM(status = 'failed')
+           FROM ingest_queue GROUP BY batch_id ORDER BY MIN(id) DESC LIMIT ?""",
+        (limit,)
+    ).fetchall()
+    return [
+        {
+            'batch_id': row[0],
+            'created_at': row[1],
+            'total': row[2],
+            'queued': row[3],
+            'running': row[4],
+            'done': row[5],
+            'failed': row[6],
+        }
+        for row in rows
+    ]
+
+
+def batch_items(batch_id):
+    """Per-file status, attempts, error, scores and near-duplicate flag for one batch."""
+    rows = _connect().execute(
+        "SELECT filename, status, attempts, error, result, duplicate_of FROM ingest_queue WHERE batch_id = ? ORDER BY id",
+        (batch_id,)
+    ).fetchall()
+    return [
+        {
+            'filename': row[0],
+            'status': row[1],
+            'attempts': row[2],
+            'error': row[3],
+            'scores': json.loads(row[4]) if row[4] else [],
+            'duplicate': row[5] is not None,
+        }
+        for row in rows
+    ]
+
+
+def retry_failed(batch_id):
+    """Put a batch's failed files back in the queue with a fresh attempt budget."""
+    conn = _connect()
+    with conn:
+        cursor = conn.execute(
+            "UPDATE ingest_queue SET status = 'queued', attempts = 0 WHERE batch_id = ? AND status = 'failed'",
+            (batch_id,)
+        )
+    return cursor.rowcount
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Process the bulk resume ingestion queue.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Worker processes to run.")
+    parser.add_argument('--forever', action='store_true', help="Keep polling instead of exiting when the queue is empty.")
+    args = parser.parse_args()
+    run_pool(args.workers, exit_when_idle=not args.forever)
@@ -0,0 +1,172 @@
+import re
+import json
+import time
+import hashlib
+import threading
+
+import db
+
+# --- LLM Backends ---
+# A backend turns a prompt into the model's raw text response. `name` and
+# `params` identify the model configuration and are part of the cache key.
+
+
+class OverloadedError(Exception):
+    """The model endpoint is busy or rate limited; the call may succeed if retried."""
+
+
+class HuggingFaceBackend:
+    """Remote text generation through a Hugging Face Inference endpoint."""
+
+    name = 'huggingface'
+
+    def __init__(self, api_token, repo_id="google/flan-t5-large", temperature=0.1, max_new_tokens=1500):
+        self.api_token = api_token
+        self.params = {
+            'repo_id': repo_id,
+            'temperature': temperature,
+            'max_new_tokens': max_new_tokens,
+        }
+        self._llm = None
+
+    def invoke(self, prompt):
+        from langchain_huggingface import HuggingFaceEndpoint
+        if self._llm is None:
+            self._llm = HuggingFaceEndpoint(
+                repo_id=self.params['repo_id'],
+                huggingfacehub_api_token=self.api_token,
+                task="text2text-generation",
+                temperature=self.params['temperature'],
+                max_new_tokens=self.params['max_new_tokens']
+            )
+        try:
+            return self._llm.invoke(prompt)
+        except Exception as e:
+            message = str(e)
+            if any(marker in message for marker in ('429', '503', 'overloaded', 'rate limit', 'currently loading')):
+                raise OverloadedError(message) from e
+            raise
+
+
+STOPWORDS = {
+    'and', 'the', 'for', 'with', 'you', 'our', 'are', 'will', 'have', 'has', 'this', 'that',
+    'from', 'your', 'who', 'all', 'can', 'not', 'but', 'their', 'they', 'into', 'about',
+    'job', 'description', 'resume', 'experience', 'skills', 'work', 'team', 'role',
+}
+WORD_RE = re.compile(r'[a-zA-Z][a-zA-Z+#.\-]{1,}')
+
+
+class LocalBackend:
+    """Deterministic offline stand-in for the remote model.
+
+    Scores keyword overlap between the resume and the job description found in
+    the prompt and answers in the same JSON schema, so the app, tests and batch
+    runs work without network access. `latency` simulates endpoint delay and
+    `overloaded_calls` makes the first N calls fail as an overloaded endpoint would.
+    """
+
+    name = 'local'
+
+    def __init__(self, latency=0.0, overloaded_calls=0):
+        self.latency = latency
+        self.overloaded_calls = overloaded_calls
+        self.params = {'version': 1}
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        # Simulate an endpoint that rejects its first `overloaded_calls` requests.
+        with self._lock:
+            overloaded = self.overloaded_calls > 0
+            if overloaded:
+                self.overloaded_calls -= 1
+        if overloaded:
+            raise OverloadedError("Local backend simulated overload (503).")
+        resume_part, _, jd_part = prompt.rpartition('Job Description:')
+        resume_part = resume_part.rpartition('Resume:')[2]
+        resume_words = self._keywords(resume_part)
+        jd_words = self._keywords(jd_part)
+        matched = sorted(jd_words & resume_words)
+        missing = sorted(jd_words - resume_words)
+        score = round(100 * len(matched) / len(jd_words)) if jd_words else 0
+        return json.dumps({
+            "overallScore": score,
+            "scoreGoodness": "Good" if score >= 60 else "Fair" if score >= 40 else "Poor",
+            "skillsMatchedCount": len(matched),
+            "skillsMissingCount": len(missing),
+            "relevantProjectsCount": 0,
+            "matchedSkills": [{"skill": skill} for skill in matched[:15]],
+            "missingSkills": [{"skill": skill} for skill in missing[:15]],
+            "experience": {"match": f"{score}%", "level": ""},
+            "education": {"match": "N/A", "level": ""},
+            "improvements": {"resume": [f"Mention your experience with {skill}." for skill in missing[:5]]},
+        })
+
+    @staticmethod
+    def _keywords(text):
+        return {word.lower().rstrip('.') for word in WORD_RE.findall(text)} - STOPWORDS
+
+
+# --- Response Cache ---
+class ResponseCache:
+    """Persistent cache of parsed LLM analyses in SQLite, with TTL and size limits.
+
+    Entries older than `ttl_seconds` are treated as misses; once more than
+    `max_entries` are stored, the least recently used ones are dropped.
+    """
+
+    def __init__(self, db_path, ttl_seconds=7 * 24 * 3600, max_entries=10000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._ready = False
+
+    @staticmethod
+    def make_key(resume_text, jd_text, prompt_version, backend):
+        payload = json.dumps([resume_text, jd_text, prompt_version, backend.name, backend.params], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        conn = db.thread_connection(self.db_path)
+        if not self._ready:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT response, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None and now - row[1] > self.ttl_seconds:
+            with conn:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            row = None
+        if row is not None:
+            with conn:
+                conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        return None if row is None else json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            conn.execute(
+                """DELETE FROM llm_cache WHERE key IN (
+                       SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            )
@@ -1,24 +1,55 @@
 import os
 import re
-import pdfplumber
-from docx import Document
-from fuzzywuzzy import fuzz
-from sentence_transformers import SentenceTransformer, util
+import argparse
 import json  # For saving results
+import numpy as np
 
-def extract_text_from_pdf(file_path):
+import encoder
+import embedding_store
+import extraction
+import ingest
+import metrics
+import text_cache
+from result_stream import ResultStream, write_summary
+from segmenter import Segmenter
+from skill_matcher import SkillMatcher
+from skill_taxonomy import SkillTaxonomy
+
+# Bump when extraction or section parsing changes so cached results are recomputed.
+EXTRACTOR_VERSION = 2
+SECTIONS_VERSION = 4
+
+BATCH_OUTPUT_PATH = os.path.join('output', 'batch_results.jsonl')
+
+def extract_text_from_pdf(file_path, truncated=None):
     """Extract raw text from a PDF file."""
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+    return extraction.extract_text(file_path, '.pdf', truncated=truncated)
 
-def extract_text_from_docx(file_path):
+def extract_text_from_docx(file_path, truncated=None):
     """Extract raw text from a DOCX file."""
-    doc = Document(file_path)
-    text = "\n".join([para.text for para in doc.paragraphs])
-    return text
+    return extraction.extract_text(file_path, '.docx', truncated=truncated)
+
+@metrics.timed_function('extract')
+def _normalized_text(file_path, ext, truncated=None):
+    """Extract text with the extractor for `ext` and collapse whitespace."""
+    if ext == '.pdf':
+        text = extract_text_from_pdf(file_path, truncated)
+    else:  # .docx
+        text = extract_text_from_docx(file_path, truncated)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def _cached_normalized_text(file_path, ext):
+    """Normalized text for a file, cached on disk by the hash of its bytes.
+
+    Text cut short by a page, size or time limit is returned but not cached.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    truncated = set()
+    return text_cache.cached(
+        data, 'main.text', EXTRACTOR_VERSION, lambda: _normalized_text(file_path, ext, truncated),
+        cacheable=lambda: not truncated
+    )
 
 def extract_resume_text(resume_path):
     """Handle resume extraction based on file type and normalize."""
@@ -26,15 +57,10 @@ def extract_resume_text(resume_path):
         raise FileNotFoundError(f"Resume file not found: {resume_path}")
     
     ext = os.path.splitext(resume_path)[1].lower()
-    if ext == '.pdf':
-        text = extract_text_from_pdf(resume_path)
-    elif ext == '.docx':
-        text = extract_text_from_docx(resume_path)
-    else:
+    if ext not in ['.pdf', '.docx']:
         raise ValueError("Unsupported resume format. Use PDF or DOCX.")
     
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return _cached_normalized_text(resume_path, ext)
 
 def extract_jd_text(jd_path):
     """Extract text from JD (supports PDF or DOCX)."""
@@ -42,17 +68,42 @@ def extract_jd_text(jd_path):
         raise FileNotFoundError(f"JD file not found: {jd_path}")
     
     ext = os.path.splitext(jd_path)[1].lower()
-    if ext in ['.pdf', '.docx']:
-        if ext == '.pdf':
-            text = extract_text_from_pdf(jd_path)
-        else:  # .docx
-            text = extract_text_from_docx(jd_path)
-    else:
+    if ext not in ['.pdf', '.docx']:
         raise ValueError("Unsupported JD format. Use PDF or DOCX.")
     
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return _cached_normalized_text(jd_path, ext)
+
+# --- Section Parsing ---
+# Header vocabularies for the single-pass segmenter; extend these to recognise more headers.
+# Resume headers only count when capitalized, since the same words often appear mid-sentence.
+RESUME_HEADERS = {
+    'objective': [r'objective', r'career\s+objective', r'summary'],
+    'skills': [r'skills', r'technical\s+skills'],
+    'experience': [r'experience', r'work\s+experience'],
+    'education': [r'education', r'educational\s+qualifications?'],
+    'projects': [r'projects'],
+    'certifications': [r'certifications'],
+}
+JD_HEADERS = {
+    'must_have_skills': [r'skills\s+(?:required|must-have)(?=\s*:)', r'qualifications(?=\s*:)'],
+    'experience': [r'experience'],
+}
+RESUME_SEGMENTER = Segmenter(RESUME_HEADERS, capitalized=True)
+JD_SEGMENTER = Segmenter(JD_HEADERS)
 
+SKILL_LABEL_RE = re.compile(r'[\w\s&]+(?=:)')
+LIST_SPLIT_RE = re.compile(r',|\n')
+TWO_WORDS_RE = re.compile(r'\w+\s+\w+')
+TWO_ALPHA_WORDS_RE = re.compile(r'[A-Za-z]+\s+[A-Za-z]+')
+JD_TITLE_RE = re.compile(r'^(.+?)(?=\n)|Job\s+Title\s*:\s*(.+?)(?=\n)', re.IGNORECASE)
+JD_ROLE_RE = re.compile(r'(?:Role|Position)\s*:\s*(.+?)(?=\n)', re.IGNORECASE)
+# Skills are looked up in the taxonomy when a document has no skills section.
+SKILL_TAXONOMY = SkillTaxonomy.load()
+# Parsed sections depend on the parser and on the taxonomy file's contents.
+SECTIONS_CACHE_VERSION = f"{SECTIONS_VERSION}-{SKILL_TAXONOMY.version}"
+
+@text_cache.memoize('main.resume_sections', SECTIONS_CACHE_VERSION)
+@metrics.timed_function('parse')
 def parse_resume_sections(resume_text):
     """Refined parsing: Extract sections like Skills, Experience, Education."""
     sections = {
@@ -61,31 +112,27 @@ def parse_resume_sections(resume_text):
         'education': [],
         'objective': ''
     }
+    segments = RESUME_SEGMENTER.segment(resume_text)
     
-    obj_match = re.search(r'Objective\s*:?\s*(.*?)(?=\s*(Skills|Experience|Education|\Z))', resume_text, re.IGNORECASE | re.DOTALL)
-    if obj_match:
-        sections['objective'] = obj_match.group(1).strip()
+    if 'objective' in segments:
+        sections['objective'] = segments['objective']
     
-    skills_match = re.search(r'Skills\s*:?\s*(.*?)(?=\s*(Experience|Education|\Z))', resume_text, re.IGNORECASE | re.DOTALL)
-    if skills_match:
-        skills_text = re.sub(r'[\w\s&]+(?=:)', '', skills_match.group(1)).strip()
-        sections['skills'] = [skill.strip() for skill in re.split(r',|\n', skills_text) if skill.strip() and any(c.isalpha() for c in skill)][:10]
+    if 'skills' in segments:
+        skills_text = SKILL_LABEL_RE.sub('', segments['skills']).strip()
+        sections['skills'] = [skill.strip() for skill in LIST_SPLIT_RE.split(skills_text) if skill.strip() and any(c.isalpha() for c in skill)][:10]
     else:
-        tech_skills = re.findall(r'(Python|SQL|Matplotlib|Seaborn|Power BI|Pandas|NumPy|Scikit-learn|BeautifulSoup)', resume_text, re.IGNORECASE)
-        sections['skills'] = list(dict.fromkeys(tech_skills))
+        sections['skills'] = SKILL_TAXONOMY.skill_names(resume_text)
     
-    exp_match = re.search(r'Experience\s*:?\s*(.*?)(?=\s*(Education|\Z))', resume_text, re.IGNORECASE | re.DOTALL)
-    if exp_match:
-        exp_text = exp_match.group(1).strip()
-        sections['experience'] = [exp.strip() for exp in re.split(r'\n', exp_text) if re.search(r'\w+\s+\w+', exp) and len(exp.split()) > 2][:2]  # More specific
+    if 'experience' in segments:
+        sections['experience'] = [exp.strip() for exp in segments['experience'].split('\n') if TWO_WORDS_RE.search(exp) and len(exp.split()) > 2][:2]  # More specific
     
-    edu_match = re.search(r'Education\s*:?\s*(.*?)(?=\s*(Projects|Certifications|\Z))', resume_text, re.IGNORECASE | re.DOTALL)
-    if edu_match:
-        edu_text = edu_match.group(1).strip()
-        sections['education'] = [edu.strip() for edu in re.split(r'\n', edu_text) if re.search(r'[A-Za-z]+\s+[A-Za-z]+', edu)][:2]
+    if 'education' in segments:
+        sections['education'] = [edu.strip() for edu in segments['education'].split('\n') if TWO_ALPHA_WORDS_RE.search(edu)][:2]
     
     return sections
 
+@text_cache.memoize('main.jd_sections', SECTIONS_CACHE_VERSION)
+@metrics.timed_function('parse')
 def parse_jd_sections(jd_text):
     """Refined parsing: Extract role title, must-have skills, etc."""
     sections = {
@@ -94,81 +141,203 @@ def parse_jd_sections(jd_text):
         'description': ''
     }
     
-    title_match = re.search(r'^(.+?)(?=\n)|Job\s+Title\s*:\s*(.+?)(?=\n)', jd_text, re.IGNORECASE)
+    title_match = JD_TITLE_RE.search(jd_text)
     if title_match:
         sections['role_title'] = title_match.group(1) if title_match.group(1) else title_match.group(2)
         sections['role_title'] = sections['role_title'].strip() if sections['role_title'] else ''
     else:
-        role_match = re.search(r'(?:Role|Position)\s*:\s*(.+?)(?=\n)', jd_text, re.IGNORECASE)
+        role_match = JD_ROLE_RE.search(jd_text)
         sections['role_title'] = role_match.group(1).strip() if role_match else ''
     
-    skills_match = re.search(r'(?:Skills\s+(?:Required|Must-have)|Qualifications):\s*(.*?)(?=\s*(Experience|\Z))', jd_text, re.IGNORECASE | re.DOTALL)
-    if skills_match:
-        skills_text = skills_match.group(1).strip()
-        sections['must_have_skills'] = [skill.strip() for skill in re.split(r',|\n', skills_text) if skill.strip() and not skill.isspace()]
+    segments = JD_SEGMENTER.segment(jd_text)
+    if 'must_have_skills' in segments:
+        sections['must_have_skills'] = [skill.strip() for skill in LIST_SPLIT_RE.split(segments['must_have_skills']) if skill.strip() and not skill.isspace()]
     else:
-        tech_skills = re.findall(r'(Python|R|Excel|Pandas|Mechanical|Manufacturing)', jd_text, re.IGNORECASE)
-        sections['must_have_skills'] = list(dict.fromkeys(tech_skills))
+        sections['must_have_skills'] = SKILL_TAXONOMY.skill_names(jd_text)
     
     sections['description'] = jd_text[:200].strip()
     
     return sections
 
+@metrics.timed_function('hard_match')
 def hard_match_score(resume_skills, jd_skills):
     """Calculate hard match score based on exact and fuzzy matching."""
     if not jd_skills or not resume_skills:
         return 0, []
     
-    matches = 0
-    matched_pairs = []
-    total_jd_skills = len(jd_skills)
-    
-    for jd_skill in jd_skills:
-        for resume_skill in resume_skills:
-            if jd_skill.lower() in resume_skill.lower() or fuzz.partial_ratio(jd_skill.lower(), resume_skill.lower()) > 80:
-                matches += 1
-                matched_pairs.append((jd_skill, resume_skill))
-                break
-    
-    score = (matches / total_jd_skills) * 50
-    return min(score, 50), matched_pairs
+    result = SkillMatcher(jd_skills).match(resume_skills)
+    return result['score'], result['matched_pairs']
+
+def cosine_to_soft_score(cosine_score):
+    """Map a cosine similarity in [-1, 1] to the 0-50 soft score range."""
+    soft_score = (float(cosine_score) + 1) / 2 * 50  # Normalize to 0-50
+    return min(soft_score, 50)
 
 def soft_match_score(resume_text, jd_text):
     """Calculate soft match score using sentence embeddings."""
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    resume_embedding = model.encode(resume_text, convert_to_tensor=True)
-    jd_embedding = model.encode(jd_text, convert_to_tensor=True)
-    cosine_score = util.pytorch_cos_sim(resume_embedding, jd_embedding).item()
-    soft_score = (cosine_score + 1) / 2 * 50  # Normalize to 0-50
-    return min(soft_score, 50)
+    # Both texts go through the shared model in a single forward pass.
+    resume_embedding, jd_embedding = encoder.encode([resume_text, jd_text])
+    return cosine_to_soft_score(resume_embedding @ jd_embedding)
 
 def save_results(resume_path, jd_path, score, matched_pairs):
-    """Save analysis results to a JSON file."""
+    """Save analysis results to a JSON file.
+
+    `score` is the (hard_score, soft_score) pair already computed by the caller.
+    """
+    hard_score, soft_score = score
     result = {
         'resume_file': os.path.basename(resume_path),
         'jd_file': os.path.basename(jd_path),
-        'hard_score': score[0],
-        'soft_score': soft_match_score(extract_resume_text(resume_path), extract_jd_text(jd_path)),
-        'total_score': score[0] + soft_match_score(extract_resume_text(resume_path), extract_jd_text(jd_path)),
+        'hard_score': hard_score,
+        'soft_score': soft_score,
+        'total_score': hard_score + soft_score,
         'matched_skills': matched_pairs
     }
     with open(os.path.join('output', 'relevance_result.json'), 'w') as f:
         json.dump(result, f, indent=4)
     print("Results saved to 'output/relevance_result.json'")
 
-def main():
+def list_documents(data_dir):
+    """Return sorted (resume_files, jd_files) found in `data_dir`."""
+    files = sorted(f for f in os.listdir(data_dir) if f.lower().endswith(('.pdf', '.docx')))
+    resume_files = [f for f in files if 'resume' in f.lower()]
+    jd_files = [f for f in files if 'jd' in f.lower()]
+    return resume_files, jd_files
+
+def score_batch(resume_paths, jd_paths, max_workers=None, stream=None):
+    """Score every resume against every JD.
+
+    Each document is extracted once (in parallel, see ingest.py) and parsed once,
+    all resumes and all JDs are embedded in two batched encode calls, and the
+    N x M cosine matrix is computed in one matrix product. Embeddings are kept in
+    the on-disk embedding store, so unchanged documents are not encoded again.
+
+    With a ResultStream, every pair's record is appended to it as soon as it is
+    scored and pairs already in the stream are skipped, so an interrupted run
+    resumes where it stopped. Returns {jd_file: rows ranked by total_score}; when
+    streaming, rows carry only the score columns.
+    """
+    def done(resume_path, jd_path):
+        return stream is not None and stream.is_done(os.path.basename(resume_path), os.path.basename(jd_path))
+
+    # Documents whose pairs are all checkpointed are not extracted or embedded again.
+    pending_resume_paths = [r for r in resume_paths if not all(done(r, j) for j in jd_paths)]
+    pending_jd_paths = [j for j in jd_paths if not all(done(r, j) for r in resume_paths)]
+
+    documents = pending_resume_paths + pending_jd_paths
+    with metrics.timed('extract.batch', items=len(documents)):
+        extracted = ingest.extract_many(
+            documents,
+            max_workers=max_workers,
+            cache_namespace='main.text',
+            cache_version=EXTRACTOR_VERSION
+        )
+    resume_docs, jd_docs = extracted[:len(pending_resume_paths)], extracted[len(pending_resume_paths):]
+
+    resumes = []
+    for doc in resume_docs:
+        if doc['error']:
+            print(f"Skipping resume {os.path.basename(doc['path'])}: {doc['error']}")
+            continue
+        if doc['truncated']:
+            print(f"Resume {os.path.basename(doc['path'])} was cut short by the {', '.join(doc['truncated'])} limit.")
+        resumes.append((doc['path'], doc['text'], parse_resume_sections(doc['text'])))
+
+    jds = []
+    for doc in jd_docs:
+        if doc['error']:
+            print(f"Skipping JD {os.path.basename(doc['path'])}: {doc['error']}")
+            continue
+        if doc['truncated']:
+            print(f"JD {os.path.basename(doc['path'])} was cut short by the {', '.join(doc['truncated'])} limit.")
+        jds.append((doc['path'], doc['text'], parse_jd_sections(doc['text'])))
+
+    rankings = {}
+    if resumes and jds:
+        resume_embeddings = embedding_store.encode_with_store(
+            embedding_store.open_store('resumes'), [text for _, text, _ in resumes]
+        )
+        jd_embeddings = embedding_store.encode_with_store(
+            embedding_store.open_store('jds'), [text for _, text, _ in jds]
+        )
+        cosine = encoder.cosine_matrix(resume_embeddings, jd_embeddings)
+        soft_scores = np.minimum((cosine + 1) / 2 * 50, 50)
+
+        for j, (jd_path, _, jd_sections) in enumerate(jds):
+            # One matcher per JD: its skills are normalized once and scored against all resumes together.
+            with metrics.timed('hard_match.batch', items=len(resumes)):
+                matches = SkillMatcher(jd_sections['must_have_skills']).match_many(
+                    [resume_sections['skills'] for _, _, resume_sections in resumes]
+                )
+            rows = []
+            for i, (resume_path, _, _) in enumerate(resumes):
+                if done(resume_path, jd_path):
+                    continue
+                hard_score = matches[i]['score']
+                soft_score = float(soft_scores[i, j])
+                row = {
+                    'resume_file': os.path.basename(resume_path),
+                    'jd_file': os.path.basename(jd_path),
+                    'hard_score': hard_score,
+                    'soft_score': soft_score,
+                    'total_score': hard_score + soft_score,
+                    'matched_skills': matches[i]['matched_pairs']
+                }
+                if stream is not None:
+                    stream.write(row)
+                else:
+                    rows.append(row)
+            rankings[os.path.basename(jd_path)] = rows
+
+    if stream is not None:
+        # Rank from the checkpoint, which also holds pairs scored by earlier runs.
+        rankings = {}
+        for row in stream.completed.values():
+            rankings.setdefault(row['jd_file'], []).append(row)
+
+    for rows in rankings.values():
+        rows.sort(key=lambda row: row['total_score'], reverse=True)
+    return rankings
+
+def print_rankings(rankings, top=None):
+    """Print one ranked table per JD."""
+    for jd_file, rows in rankings.items():
+        print(f"\nRanking for {jd_file}:")
+        print(f"{'Rank':>4}  {'Resume':<30} {'Hard':>6} {'Soft':>6} {'Total':>7}")
+        for rank, row in enumerate(rows[:top], start=1):
+            print(f"{rank:>4}  {row['resume_file'][:30]:<30} {row['hard_score']:>6.2f} {row['soft_score']:>6.2f} {row['total_score']:>7.2f}")
+
+def main(batch=False, top=None, workers=None, output_path=BATCH_OUTPUT_PATH, restart=False, summary=False):
     data_dir = 'data'
     if not os.path.exists(data_dir):
         print(f"Error: 'data' folder not found. Please create it and add sample files.")
         return
     
-    resume_files = [f for f in os.listdir(data_dir) if f.lower().endswith(('.pdf', '.docx')) and 'resume' in f.lower()]
-    jd_files = [f for f in os.listdir(data_dir) if f.lower().endswith(('.pdf', '.docx')) and 'jd' in f.lower()]
+    resume_files, jd_files = list_documents(data_dir)
     
     if not resume_files or not jd_files:
         print("Error: No resume or JD files found in 'data' folder. Add sample files (PDFs with 'resume' or 'jd' in name).")
         return
     
+    if batch:
+        if restart and os.path.exists(output_path):
+            os.remove(output_path)
+        with ResultStream(output_path) as stream:
+            already_done = len(stream.completed)
+            if already_done:
+                print(f"Resuming from {output_path}: {already_done} pairs already scored.")
+            rankings = score_batch(
+                [os.path.join(data_dir, f) for f in resume_files],
+                [os.path.join(data_dir, f) for f in jd_files],
+                max_workers=workers,
+                stream=stream
+            )
+        print_rankings(rankings, top)
+        print(f"\nResults streamed to '{output_path}'")
+        if summary:
+            print(f"Summary saved to '{write_summary(output_path)}'")
+        return
+    
     resume_path = os.path.join(data_dir, resume_files[0])
     jd_path = os.path.join(data_dir, jd_files[0])
     
@@ -213,4 +382,12 @@ def main():
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Score resumes against job descriptions in the 'data' folder.")
+    parser.add_argument('--batch', action='store_true', help="Score every resume against every JD and print a ranking per JD.")
+    parser.add_argument('--top', type=int, default=None, help="Only show the top N resumes per JD in batch mode.")
+    parser.add_argument('--workers', type=int, default=None, help="Extraction worker processes in batch mode (default: CPU count).")
+    parser.add_argument('--output', default=BATCH_OUTPUT_PATH, help="JSONL file batch results are streamed to; also the resume checkpoint.")
+    parser.add_argument('--restart', action='store_true', help="Discard existing batch results instead of resuming from them.")
+    parser.add_argument('--summary', action='store_true', help="Also write a columnar score summary next to the batch output.")
+    args = parser.parse_args()
+    main(batch=args.batch, top=args.top, workers=args.workers, output_path=args.output, restart=args.restart, summary=args.summary)
\ No newline at end of file
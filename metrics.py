@@ -0,0 +1,227 @@
+import os
+import time
+import atexit
+import sqlite3
+import threading
+import functools
+from contextlib import contextmanager
+
+import numpy as np
+
+# --- Stage Timing ---
+# Lightweight latency instrumentation. record() only appends to an in-memory
+# buffer; a background thread flushes it to results.db every
+# FLUSH_EVERY_SECONDS over one persistent connection. Each stage keeps only its
+# most recent MAX_SAMPLES_PER_STAGE rows; that rolling window is trimmed every
+# TRIM_EVERY_SECONDS rather than on every flush.
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results.db')
+MAX_SAMPLES_PER_STAGE = 5000
+FLUSH_EVERY_SECONDS = 5.0
+TRIM_EVERY_SECONDS = 300.0
+MAX_BUFFERED_SAMPLES = 100000  # Beyond this, samples are dropped until the next flush.
+ENABLED = os.environ.get('HIRESIGHT_METRICS', '1') != '0'
+
+_lock = threading.Lock()
+_db_lock = threading.Lock()
+_samples = []
+_cache_counts = {}
+_last_trim = 0.0
+_conn = None
+_conn_pid = None
+_flusher_pid = None
+
+
+def _ensure_flusher():
+    # Started lazily, and again in forked worker processes, which do not inherit threads.
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_periodically, name="metrics-flusher", daemon=True).start()
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(FLUSH_EVERY_SECONDS)
+        flush()
+
+
+def record(stage, seconds, items=1):
+    """Record one timing sample for `stage`."""
+    if not ENABLED:
+        return
+    if _flusher_pid != os.getpid():
+        _ensure_flusher()
+    with _lock:
+        if len(_samples) < MAX_BUFFERED_SAMPLES:
+            _samples.append((stage, seconds * 1000, items, time.time()))
+
+
+def record_cache(cache, hit):
+    """Count a hit or miss for the named cache."""
+    if not ENABLED:
+        return
+    if _flusher_pid != os.getpid():
+        _ensure_flusher()
+    with _lock:
+        hits, misses = _cache_counts.get(cache, (0, 0))
+        _cache_counts[cache] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+
+@contextmanager
+def timed(stage, items=1):
+    """Time the enclosed block as one sample of `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start, items)
+
+
+def timed_function(stage):
+    """Decorator form of timed()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _connect():
+    """The process's metrics connection; callers hold _db_lock."""
+    global _conn, _conn_pid
+    if _conn is not None and _conn_pid == os.getpid():
+        return _conn
+    # A connection inherited across fork must not be used; the child opens its own.
+    conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stage_timings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stage TEXT NOT NULL,
+            duration_ms REAL NOT NULL,
+            items INTEGER NOT NULL,
+            recorded_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_stage_timings_stage ON stage_timings (stage, id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            cache TEXT PRIMARY KEY,
+            hits INTEGER NOT NULL DEFAULT 0,
+            misses INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.commit()
+    _conn, _conn_pid = conn, os.getpid()
+    return conn
+
+
+def _trim(conn):
+    stages = [stage for (stage,) in conn.execute("SELECT DISTINCT stage FROM stage_timings")]
+    for stage in stages:
+        conn.execute(
+            """DELETE FROM stage_timings WHERE stage = ? AND id <= (
+                   SELECT id FROM stage_timings WHERE stage = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+               )""",
+            (stage, stage, MAX_SAMPLES_PER_STAGE)
+        )
+
+
+def flush():
+    """Write buffered samples and cache counters to results.db."""
+    global _samples, _cache_counts, _last_trim
+    with _lock:
+        samples, _samples = _samples, []
+        cache_counts, _cache_counts = _cache_counts, {}
+    if not samples and not cache_counts:
+        return
+    try:
+        with _db_lock:
+            conn = _connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO stage_timings (stage, duration_ms, items, recorded_at) VALUES (?, ?, ?, ?)",
+                    samples
+                )
+                conn.executemany(
+                    """INSERT INTO cache_stats (cache, hits, misses) VALUES (?, ?, ?)
+                       ON CONFLICT(cache) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses""",
+                    [(cache, hits, misses) for cache, (hits, misses) in cache_counts.items()]
+                )
+                if time.monotonic() - _last_trim >= TRIM_EVERY_SECONDS:
+                    _trim(conn)
+                    _last_trim = time.monotonic()
+    except sqlite3.Error:
+        # Metrics must never break the pipeline; these samples are simply lost.
+        pass
+
+
+atexit.register(flush)
+
+
+def stage_summary(since_seconds=None):
+    """Per-stage latency percentiles and throughput over the stored window.
+
+    Returns a list of dicts with stage, samples, p50/p95/p99 in ms and
+    items_per_s (items processed per second of time spent in the stage).
+    """
+    flush()
+    query = "SELECT stage, duration_ms, items FROM stage_timings"
+    params = []
+    if since_seconds:
+        query += " WHERE recorded_at >= ?"
+        params.append(time.time() - since_seconds)
+    with _db_lock:
+        rows = _connect().execute(query, params).fetchall()
+
+    by_stage = {}
+    for stage, duration_ms, items in rows:
+        by_stage.setdefault(stage, ([], []))
+        by_stage[stage][0].append(duration_ms)
+        by_stage[stage][1].append(items)
+
+    summary = []
+    for stage, (durations, items) in sorted(by_stage.items()):
+        durations = np.array(durations)
+        p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+        busy_seconds = durations.sum() / 1000
+        summary.append({
+            'stage': stage,
+            'samples': len(durations),
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'items_per_s': round(float(sum(items) / busy_seconds), 1) if busy_seconds else None,
+        })
+    return summary
+
+
+def cache_summary():
+    """Hits, misses and hit rate for every instrumented cache."""
+    flush()
+    with _db_lock:
+        rows = _connect().execute("SELECT cache, hits, misses FROM cache_stats ORDER BY cache").fetchall()
+    return [
+        {
+            'cache': cache,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+        for cache, hits, misses in rows
+    ]
+
+
+def reset():
+    """Delete all stored samples and cache counters."""
+    global _samples, _cache_counts
+    with _lock:
+        _samples, _cache_counts = [], {}
+    with _db_lock:
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM stage_timings")
+            conn.execute("DELETE FROM cache_stats")
@@ -1,27 +1,230 @@
+import math
 import streamlit as st
-import pandas as pd
-import sqlite3
-import json
+import metrics
+import cascade
+import job_queue
 from processor import (
     init_db,
     extract_text_from_file,
-    save_job_to_db
+    save_job_to_db,
+    load_jobs_page,
+    count_jobs,
+    jobs_version,
+    SCORE_STORE
 )
 
 # --- Initialize Database ---
 # This ensures the DB and tables are created when the app starts
 init_db()
+# Fill in any scores that are missing, e.g. after a scorer version bump, once per session.
+if "scores_scheduled" not in st.session_state:
+    SCORE_STORE.schedule()
+    st.session_state.scores_scheduled = True
 
 # --- Page Config ---
 st.set_page_config(page_title="HireSight Admin", layout="wide")
 st.title("HireSight — Recruiter Admin Panel")
 
+# --- Job Picker ---
+# Streamlit runs every tab on each rerun, so pickers show one cached, searchable
+# page of jobs instead of loading the whole catalogue. Keyed on jobs_version(),
+# as in the seeker portal, so saving a new JD invalidates the cached pages.
+PICKER_JOBS_PER_PAGE = 50
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_jobs_page(version, offset, limit, search):
+    return load_jobs_page(offset, limit, search)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_job_count(version, search):
+    return count_jobs(search)
+
+def job_picker(key, label, multi=False):
+    """Pick a job (or several with multi=True) from a searchable, paged list.
+
+    Returns the selected job id, or a list of ids with multi=True. Multi-select
+    choices are kept in session state, so they survive searching and paging.
+    """
+    version = jobs_version()
+    selected = st.session_state.setdefault(f"{key}_selected", {}) if multi else None
+    search_col, page_col = st.columns([3, 1])
+    search = search_col.text_input("Search job titles", key=f"{key}_search").strip() or None
+    total = cached_job_count(version, search)
+    page_count = max(math.ceil(total / PICKER_JOBS_PER_PAGE), 1)
+    # A narrower search can leave the remembered page past the end.
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    page = int(page_col.number_input("Page", min_value=1, max_value=page_count, key=f"{key}_page",
+                                     disabled=page_count == 1))
+    jobs = cached_jobs_page(version, (page - 1) * PICKER_JOBS_PER_PAGE, PICKER_JOBS_PER_PAGE, search)
+    labels = {f"{job['title']} (#{job['id']})": job['id'] for job in jobs}
+    if total > len(jobs):
+        st.caption(f"Showing {len(jobs)} of {total} jobs; search or change the page to find others.")
+
+    if not multi:
+        if not labels:
+            st.info("No jobs match your search." if search else "No jobs saved yet.")
+            return None
+        return labels[st.selectbox(label, list(labels), key=f"{key}_choice")]
+
+    chosen = st.multiselect(label, list(dict.fromkeys([*selected, *labels])), default=list(selected))
+    # Jobs on other pages stay selected; only this page's options can be toggled here.
+    for job_label in list(selected):
+        if job_label not in chosen:
+            del selected[job_label]
+    for job_label in chosen:
+        selected.setdefault(job_label, labels.get(job_label))
+    return list(selected.values())
+
 # --- UI Layout ---
-tabs = st.tabs(["Dashboard", "Upload JD", "Upload Resume (Legacy)", "Admin"])
+tabs = st.tabs(["Dashboard", "Upload JD", "Bulk Resume Upload", "Admin"])
 
 with tabs[0]:
     st.header("Results Dashboard")
-    # You can add logic here to view analysis results if needed
+
+    st.subheader("Ranked Candidates")
+    ranking_job = job_picker("ranking_job", "Job")
+    if ranking_job is not None:
+        candidates = SCORE_STORE.ranked_candidates(ranking_job)
+        if candidates:
+            st.dataframe(
+                [
+                    {
+                        "Rank": rank,
+                        "Resume": candidate['filename'] or f"Resume #{candidate['resume_id']}",
+                        "Hard": round(candidate['hard_score'], 1),
+                        "Soft": round(candidate['soft_score'], 1),
+                        "Total": round(candidate['total_score'], 1),
+                    }
+                    for rank, candidate in enumerate(candidates, start=1)
+                ],
+                width="stretch"
+            )
+        else:
+            st.info("No candidates scored for this job yet.")
+        score_stats = SCORE_STORE.stats()
+        if score_stats['missing'] > 0:
+            st.caption(f"{score_stats['missing']} resume/job pairs are still being scored in the background.")
+
+        st.subheader("Cascade Ranking")
+        st.caption(
+            "Prefilters every stored resume by vector similarity, reranks the survivors by skill and "
+            "semantic score, then runs the AI analysis on the top candidates within an LLM call budget."
+        )
+        cols = st.columns(4)
+        prefilter_k = cols[0].number_input("Prefilter keeps", min_value=1, value=cascade.PREFILTER_K)
+        rerank_k = cols[1].number_input("Rerank keeps", min_value=1, value=cascade.RERANK_K)
+        analyze_k = cols[2].number_input("Analyze top", min_value=0, value=cascade.ANALYZE_K)
+        llm_budget = cols[3].number_input(
+            f"LLM calls per job ({cascade.LLM_BUDGET_WINDOW_HOURS:g} h)", min_value=0, value=cascade.LLM_BUDGET
+        )
+        if st.button("Run Cascade"):
+            with st.spinner("Ranking candidates..."):
+                st.session_state.cascade_result = cascade.rank_candidates(
+                    ranking_job, int(prefilter_k), int(rerank_k), int(analyze_k), int(llm_budget)
+                )
+        result = st.session_state.get('cascade_result')
+        if result and result['job_id'] == ranking_job:
+            st.dataframe(
+                [
+                    {
+                        "Stage": stage['stage'],
+                        "In": stage['in'],
+                        "Out": stage['out'],
+                        "Cutoff": stage['cutoff'],
+                        "Time (s)": stage['seconds'],
+                    }
+                    for stage in result['stages']
+                ],
+                width="stretch"
+            )
+            analysis_stage = result['stages'][-1]
+            if analysis_stage['error']:
+                st.warning(f"AI analysis skipped: {analysis_stage['error']}")
+            else:
+                st.caption(
+                    f"{analysis_stage['llm_calls']} LLM calls made, {analysis_stage['budget_left']} of "
+                    f"{analysis_stage['llm_budget']} left for this job in the last "
+                    f"{cascade.LLM_BUDGET_WINDOW_HOURS:g} h, "
+                    f"{analysis_stage['cached']} analyses reused from cache."
+                )
+            st.dataframe(
+                [
+                    {
+                        "Rank": rank,
+                        "Resume": candidate['filename'] or f"Resume #{candidate['resume_id']}",
+                        "AI Score": candidate['analysis'].get('overallScore') if candidate['analysis'] else None,
+                        "Hard": round(candidate['hard_score'], 1),
+                        "Soft": round(candidate['soft_score'], 1),
+                        "Total": round(candidate['total_score'], 1),
+                    }
+                    for rank, candidate in enumerate(result['candidates'], start=1)
+                ],
+                width="stretch"
+            )
+
+    st.subheader("Bulk Uploads")
+    batches = job_queue.list_batches()
+    if not batches:
+        st.info("No bulk uploads yet. Queue resumes from the Bulk Resume Upload tab.")
+    else:
+        labels = {
+            f"{batch['batch_id']} ({batch['done']}/{batch['total']} scored)": batch for batch in batches
+        }
+        batch = labels[st.selectbox("Upload batch", list(labels))]
+        finished = batch['done'] + batch['failed']
+        st.progress(finished / batch['total'], text=f"{finished} of {batch['total']} files processed")
+        cols = st.columns(4)
+        cols[0].metric("Queued", batch['queued'])
+        cols[1].metric("Running", batch['running'])
+        cols[2].metric("Scored", batch['done'])
+        cols[3].metric("Failed", batch['failed'])
+
+        items = job_queue.batch_items(batch['batch_id'])
+        st.dataframe(
+            [
+                {
+                    "File": item['filename'],
+                    "Status": item['status'],
+                    "Attempts": item['attempts'],
+                    "Near-duplicate": item['duplicate'],
+                    "Best Match": item['scores'][0]['title'] if item['scores'] else "",
+                    "Best Score": round(item['scores'][0]['total_score'], 1) if item['scores'] else None,
+                    "Error": item['error'] or "",
+                }
+                for item in items
+            ],
+            width="stretch"
+        )
+
+        # Ranked candidates per JD, from the files scored so far.
+        by_job = {}
+        for item in items:
+            for score in item['scores']:
+                by_job.setdefault(score['title'], []).append((item['filename'], score))
+        for title, rows in by_job.items():
+            with st.expander(f"Ranking for {title}"):
+                rows.sort(key=lambda row: row[1]['total_score'], reverse=True)
+                st.dataframe(
+                    [
+                        {
+                            "Resume": filename,
+                            "Hard": round(score['hard_score'], 1),
+                            "Soft": round(score['soft_score'], 1),
+                            "Total": round(score['total_score'], 1),
+                        }
+                        for filename, score in rows
+                    ],
+                    width="stretch"
+                )
+
+        cols = st.columns(2)
+        if cols[0].button("Refresh"):
+            st.rerun()
+        if batch['failed'] and cols[1].button("Retry Failed Files"):
+            job_queue.retry_failed(batch['batch_id'])
+            job_queue.start_workers()
+            st.rerun()
 
 with tabs[1]:
     st.header("Upload Job Description (JD)")
@@ -45,8 +248,71 @@ with tabs[1]:
         else:
             st.error("Please fill in all fields before processing.")
             
-# The other tabs can be left as placeholders or built out later.
 with tabs[2]:
-    st.info("This is a legacy tab. Please use the main Job Seeker app for analysis.")
+    st.header("Bulk Resume Upload")
+    st.caption("Files are queued and scored by background workers; follow progress in the Dashboard tab.")
+
+    resume_files = st.file_uploader(
+        "Upload resumes (PDF/DOCX) or ZIP archives of them",
+        type=["pdf", "docx", "zip"],
+        accept_multiple_files=True
+    )
+    selected_jobs = job_picker("bulk_jobs", "Score against these jobs", multi=True)
+
+    if st.button("Queue Resumes"):
+        if resume_files and selected_jobs:
+            batch_id, queued = job_queue.enqueue_uploads(
+                [(file.name, file.getvalue()) for file in resume_files], selected_jobs
+            )
+            if queued:
+                job_queue.start_workers()
+                st.success(f"Queued {queued} resume(s) as batch {batch_id}.")
+            else:
+                st.error("No PDF or DOCX resumes found in the upload.")
+        else:
+            st.error("Please upload resumes and select at least one job.")
 with tabs[3]:
-    st.info("Admin functions can be added here.")
\ No newline at end of file
+    st.header("Pipeline Latency")
+    windows = {"Last hour": 3600, "Last 24 hours": 24 * 3600, "All stored samples": None}
+    window = st.selectbox("Time window", list(windows), index=1)
+
+    stages = metrics.stage_summary(windows[window])
+    if stages:
+        st.dataframe(
+            [
+                {
+                    "Stage": row['stage'],
+                    "Samples": row['samples'],
+                    "p50 (ms)": row['p50_ms'],
+                    "p95 (ms)": row['p95_ms'],
+                    "p99 (ms)": row['p99_ms'],
+                    "Throughput (items/s)": row['items_per_s'],
+                }
+                for row in stages
+            ],
+            width="stretch"
+        )
+    else:
+        st.info("No timing samples recorded yet. Use the app or run main.py to collect some.")
+
+    st.subheader("Cache Hit Rates")
+    caches = metrics.cache_summary()
+    if caches:
+        st.dataframe(
+            [
+                {
+                    "Cache": row['cache'],
+                    "Hits": row['hits'],
+                    "Misses": row['misses'],
+                    "Hit Rate": f"{row['hit_rate']:.0%}" if row['hit_rate'] is not None else "N/A",
+                }
+                for row in caches
+            ],
+            width="stretch"
+        )
+    else:
+        st.info("No cache lookups recorded yet.")
+
+    if st.button("Reset Metrics"):
+        metrics.reset()
+        st.rerun()
\ No newline at end of file
@@ -1,7 +1,18 @@
 import streamlit as st
 import time
 import json
-from processor import load_jobs_from_db, extract_text_from_file, analyze_resume
+import math
+from processor import (
+    load_jobs_page,
+    load_job_description,
+    count_jobs,
+    list_job_skills,
+    jobs_version,
+    extract_text_from_file,
+    analyze_resume,
+    recommend_jobs
+)
+from async_analysis import analyze_across_jobs_sync
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="HireSight Job Seeker", layout="wide")
@@ -14,6 +25,10 @@ if "page" not in st.session_state:
     st.session_state.username = ""
     st.session_state.selected_job = None
     st.session_state.analysis_result = None
+    st.session_state.recommendations = None
+    st.session_state.comparison = None
+    st.session_state.resume = None
+    st.session_state.job_page = 0
 
 # --- STYLING ---
 def load_css():
@@ -45,6 +60,150 @@ def render_login():
             else:
                 st.error("Please enter a username.")
 
+def render_comparison(resume_text, jobs):
+    """Analyzes the resume against the given jobs concurrently, filling in rows as results arrive.
+
+    The finished table is kept in session state, so it survives later reruns.
+    """
+    if not jobs:
+        st.warning("No jobs have been posted yet. Please check back later.")
+        return
+
+    progress = st.progress(0.0, text="Analyzing your resume against your best matches...")
+    table = st.empty()
+    rows = []
+
+    def on_result(job, result):
+        rows.append({
+            "Job": job['title'],
+            "Overall Score": result.get('overallScore', 'N/A'),
+            "Skills Matched": result.get('skillsMatchedCount', 'N/A'),
+            "Status": result['error'] if 'error' in result else "Done"
+        })
+        progress.progress(len(rows) / len(jobs), text=f"Analyzed {len(rows)} of {len(jobs)} jobs")
+        table.dataframe(rows, width="stretch")
+
+    analyze_across_jobs_sync(resume_text, jobs, on_result)
+    progress.empty()
+    st.session_state.comparison = rows
+
+# --- CACHED JOB QUERIES ---
+# Keyed on jobs_version(), so saving a new JD invalidates every cached page.
+JOBS_PER_PAGE = 10
+ALL_SKILLS = "All skills"
+# One LLM call per job, so "compare" covers only the best matches, never the whole catalogue.
+RECOMMENDED_JOBS = 5
+MAX_COMPARE_JOBS = 20
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_jobs_page(version, offset, limit, search, skill):
+    return load_jobs_page(offset, limit, search, skill)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_job_count(version, search, skill):
+    return count_jobs(search, skill)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_job_skills(version):
+    return list_job_skills()
+
+def get_resume(uploaded_file):
+    """Extracts the uploaded resume once per file and keeps it in session state."""
+    if uploaded_file is None:
+        st.session_state.resume = None
+        return None
+    resume = st.session_state.get("resume")
+    if not resume or resume["file_id"] != uploaded_file.file_id:
+        with st.spinner("Reading your resume..."):
+            resume = {"file_id": uploaded_file.file_id, "text": extract_text_from_file(uploaded_file)}
+        st.session_state.resume = resume
+        st.session_state.recommendations = None
+        st.session_state.comparison = None
+    return resume["text"]
+
+def start_analysis(job, resume_text):
+    """Runs the AI analysis for one job and switches to the results page."""
+    st.session_state.selected_job = job
+    with st.spinner("Analyzing your resume..."):
+        st.session_state.analysis_result = analyze_resume(resume_text, job['description_full'])
+        st.session_state.page = "results"
+        st.rerun()
+
+def render_recommendations(resume_text):
+    """Shows the best-matching jobs for the uploaded resume."""
+    st.header("Top Matches For Your Resume")
+    # Rank once per uploaded file; widget reruns reuse the stored ranking. The
+    # longer list is what "compare" analyzes; the first few are shown here.
+    if st.session_state.get("recommendations") is None:
+        with st.spinner("Finding your best matches..."):
+            st.session_state.recommendations = recommend_jobs(resume_text, top_k=MAX_COMPARE_JOBS)
+    matches = st.session_state.recommendations
+
+    for job in matches[:RECOMMENDED_JOBS]:
+        st.write(f"**{job['title']}** — {job['match_score']}% match")
+        if st.button("Analyze with AI", key=f"recommend_button_{job['id']}"):
+            start_analysis(job, resume_text)
+
+    if st.button(f"Compare Against Your Top {len(matches)} Matches", key="compare_all_button", disabled=not matches):
+        render_comparison(resume_text, matches)
+    elif st.session_state.get("comparison"):
+        st.dataframe(st.session_state.comparison, width="stretch")
+
+def render_job_list(resume_text):
+    """Renders one page of the job catalogue with server-side search and skill filtering."""
+    version = jobs_version()
+
+    search_col, skill_col = st.columns([2, 1])
+    search = search_col.text_input("Search job titles", key="job_search").strip() or None
+    skill = skill_col.selectbox("Filter by skill", [ALL_SKILLS] + cached_job_skills(version), key="job_skill")
+    skill = None if skill == ALL_SKILLS else skill
+
+    # Go back to the first page whenever the filters change.
+    if st.session_state.get("job_filters") != (search, skill):
+        st.session_state.job_filters = (search, skill)
+        st.session_state.job_page = 0
+
+    total = cached_job_count(version, search, skill)
+    if not total:
+        st.warning("No jobs match your search." if search or skill else "No jobs have been posted yet. Please check back later.")
+        return
+
+    page_count = math.ceil(total / JOBS_PER_PAGE)
+    page = min(st.session_state.get("job_page", 0), page_count - 1)
+    jobs = cached_jobs_page(version, page * JOBS_PER_PAGE, JOBS_PER_PAGE, search, skill)
+
+    for job in jobs:
+        with st.container():
+            st.subheader(job['title'])
+            
+            # Create a dummy company email/name for display
+            company_info = job['title'].replace(' ', '') + "@example.com"
+            st.write(f"**{company_info}**")
+            
+            st.markdown(
+                f"""
+                <p>{job['snippet'][:100]}...</p>
+                """, unsafe_allow_html=True
+            )
+
+            skills_html = "".join([f"<span class='skill-tag'>{skill}</span>" for skill in job['skills']])
+            st.markdown(skills_html, unsafe_allow_html=True)
+            
+            if st.button("Analyze with AI", key=f"button_{job['id']}", disabled=not resume_text,
+                         help=None if resume_text else "Upload your resume above first."):
+                start_analysis(dict(job, description_full=load_job_description(job['id'])), resume_text)
+
+            st.markdown('<hr class="job-divider">', unsafe_allow_html=True)
+
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button("← Previous", disabled=page == 0, key="jobs_prev"):
+        st.session_state.job_page = page - 1
+        st.rerun()
+    info_col.caption(f"Page {page + 1} of {page_count} · {total} jobs")
+    if next_col.button("Next →", disabled=page >= page_count - 1, key="jobs_next"):
+        st.session_state.job_page = page + 1
+        st.rerun()
+
 def render_dashboard():
     """Renders the main job dashboard."""
     st.title(f"Welcome back, {st.session_state.username}!")
@@ -63,46 +222,21 @@ def render_dashboard():
     left_col, right_col = st.columns([2, 1])
 
     with left_col:
+        # One shared uploader; every job on the page analyzes this resume.
+        uploaded_file = st.file_uploader(
+            "Upload your resume to see the jobs that fit you best",
+            type=["pdf", "docx"],
+            key="resume_uploader"
+        )
+        resume_text = get_resume(uploaded_file)
+
+        if resume_text:
+            render_recommendations(resume_text)
+
+        st.markdown('<hr class="job-divider">', unsafe_allow_html=True)
+
         st.header("Find Your Perfect Job")
-        JOBS = load_jobs_from_db()
-
-        if not JOBS:
-            st.warning("No jobs have been posted yet. Please check back later.")
-        else:
-            for job in JOBS:
-                with st.container():
-                    st.subheader(job['title'])
-                    
-                    # Create a dummy company email/name for display
-                    company_info = job['title'].replace(' ', '') + "@example.com"
-                    st.write(f"**{company_info}**")
-                    
-                    st.markdown(
-                        f"""
-                        <p>{job['description_full'][:100]}...</p>
-                        """, unsafe_allow_html=True
-                    )
-
-                    skills_html = "".join([f"<span class='skill-tag'>{skill}</span>" for skill in job['skills']])
-                    st.markdown(skills_html, unsafe_allow_html=True)
-                    
-                    uploaded_file = st.file_uploader(
-                        "Upload your resume",
-                        type=["pdf", "docx"],
-                        key=f"uploader_{job['id']}"
-                    )
-                    
-                    if uploaded_file:
-                        if st.button("Analyze with AI", key=f"button_{job['id']}"):
-                            st.session_state.selected_job = job
-                            with st.spinner("Analyzing your resume..."):
-                                resume_text = extract_text_from_file(uploaded_file)
-                                jd_text = job['description_full']
-                                st.session_state.analysis_result = analyze_resume(resume_text, jd_text)
-                                st.session_state.page = "results"
-                                st.rerun()
-
-                    st.markdown('<hr class="job-divider">', unsafe_allow_html=True)
+        render_job_list(resume_text)
 
     with right_col:
         st.header("Recent Applications")
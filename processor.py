@@ -1,15 +1,21 @@
 import streamlit as st
-import sqlite3
 import os
 import json
 import re
+import threading
 
-# Third-party libraries
-import PyPDF2
-import docx2txt
-import pdfplumber
-# --- We are using the stable, reliable class ---
-from langchain_huggingface import HuggingFaceEndpoint
+import numpy as np
+
+import db
+import dedup
+import encoder
+import embedding_store
+import extraction
+import llm
+import metrics
+import prompt_builder
+import score_store
+import text_cache
 
 # --- Database ---
 # This logic ensures the app finds the single database in the project's root folder.
@@ -19,42 +25,158 @@ if os.path.basename(current_dir) == 'pages':
 else:
     PROJECT_ROOT = current_dir
 DB_PATH = os.path.join(PROJECT_ROOT, 'results.db')
+# Materialized (resume, job) scores; see score_store.py.
+SCORE_STORE = score_store.ScoreStore(DB_PATH)
+
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+def get_connection():
+    """Return this thread's SQLite connection, opening it on first use.
 
+    Connections are kept for the life of the thread and use WAL journaling (see
+    db.py), so Streamlit reruns read while writers commit instead of reopening the file.
+    The schema is created the first time any thread asks for a connection.
+    """
+    if not _schema_ready:
+        init_db()
+    return db.thread_connection(DB_PATH)
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    # Create jobs table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT NOT NULL,
-            skills TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    conn.close()
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        conn = db.thread_connection(DB_PATH)
+        cursor = conn.cursor()
+        # Create jobs table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                skills TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                embedding BLOB,
+                embedding_model TEXT
+            )
+        """)
+        # Databases created before JD embeddings were stored lack these columns.
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(jobs)")]
+        if 'embedding' not in columns:
+            cursor.execute("ALTER TABLE jobs ADD COLUMN embedding BLOB")
+        if 'embedding_model' not in columns:
+            cursor.execute("ALTER TABLE jobs ADD COLUMN embedding_model TEXT")
+        # One row per (job, lowercased skill) so skill filters can use an index.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS job_skills (
+                job_id INTEGER NOT NULL REFERENCES jobs (id),
+                skill TEXT NOT NULL,
+                PRIMARY KEY (skill, job_id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_timestamp ON jobs (timestamp, id)")
+        # Title search is a substring match, which no index can serve; drop the one older databases have.
+        cursor.execute("DROP INDEX IF EXISTS idx_jobs_title")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_skills_job ON job_skills (job_id)")
+        unindexed = cursor.execute(
+            "SELECT id, skills FROM jobs WHERE id NOT IN (SELECT job_id FROM job_skills)"
+        ).fetchall()
+        for job_id, skills in unindexed:
+            _index_job_skills(cursor, job_id, json.loads(skills or '[]'))
+        conn.commit()
+        _schema_ready = True
 
-def save_job_to_db(title, description, skills):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO jobs (title, description, skills) VALUES (?, ?, ?)",
-        (title, description, json.dumps(skills))
+def _index_job_skills(cursor, job_id, skills):
+    cursor.executemany(
+        "INSERT OR IGNORE INTO job_skills (job_id, skill) VALUES (?, ?)",
+        [(job_id, skill.strip().lower()) for skill in skills if skill.strip()]
     )
-    conn.commit()
-    conn.close()
 
+def _embedding_to_blob(embedding):
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+def _blob_to_embedding(blob):
+    return np.frombuffer(blob, dtype=np.float32)
+
+@metrics.timed_function('db.save_job')
+def save_job_to_db(title, description, skills):
+    # JDs never change after posting, so the embedding is computed once here (and again only
+    # if the encoder changes; see embedding_store.refresh_job_embeddings).
+    embedding = encoder.encode([description])[0]
+    conn = get_connection()
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO jobs (title, description, skills, embedding, embedding_model) VALUES (?, ?, ?, ?, ?)",
+            (title, description, json.dumps(skills), _embedding_to_blob(embedding), encoder.model_id())
+        )
+        _index_job_skills(cursor, cursor.lastrowid, skills)
+    # Only the new job's pairs are missing, so this scores it against stored resumes.
+    SCORE_STORE.schedule()
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _job_filters(search=None, skill=None):
+    clauses, params = [], []
+    if search:
+        # '%' and '_' in the search text match themselves, not any characters.
+        clauses.append("title LIKE ? ESCAPE '\\'")
+        params.append(f"%{_escape_like(search)}%")
+    if skill:
+        clauses.append("id IN (SELECT job_id FROM job_skills WHERE skill = ?)")
+        params.append(skill.strip().lower())
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+@metrics.timed_function('db.load_jobs_page')
+def load_jobs_page(offset=0, limit=20, search=None, skill=None):
+    """Return one page of jobs, newest first, without their full descriptions.
+
+    Each job carries a short 'snippet'; use load_job_description for the full text.
+    `search` matches the title, `skill` filters on an exact (case-insensitive) skill.
+    """
+    where, params = _job_filters(search, skill)
+    rows = get_connection().execute(
+        f"""SELECT id, title, substr(description, 1, 200), skills, timestamp FROM jobs
+            {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?""",
+        params + [limit, offset]
+    ).fetchall()
+    return [
+        {
+            "id": job[0],
+            "title": job[1],
+            "snippet": job[2],
+            "skills": json.loads(job[3]),
+            "timestamp": job[4]
+        }
+        for job in rows
+    ]
+
+@metrics.timed_function('db.count_jobs')
+def count_jobs(search=None, skill=None):
+    where, params = _job_filters(search, skill)
+    return get_connection().execute(f"SELECT COUNT(*) FROM jobs {where}", params).fetchone()[0]
+
+def load_job_description(job_id):
+    row = get_connection().execute("SELECT description FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return row[0] if row else None
+
+def list_job_skills():
+    """All distinct (lowercased) skills across jobs, for filter menus."""
+    return [row[0] for row in get_connection().execute("SELECT DISTINCT skill FROM job_skills ORDER BY skill")]
+
+def jobs_version():
+    """A cheap fingerprint of the jobs table; it changes whenever a job is saved."""
+    return tuple(get_connection().execute("SELECT COUNT(*), MAX(id) FROM jobs").fetchone())
+
+@metrics.timed_function('db.load_jobs')
 def load_jobs_from_db():
-    if not os.path.exists(DB_PATH):
-        return []
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM jobs ORDER BY timestamp DESC")
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT id, title, description, skills, timestamp FROM jobs ORDER BY timestamp DESC, id DESC")
     jobs = cursor.fetchall()
-    conn.close()
     
     job_list = []
     for job in jobs:
@@ -67,61 +189,165 @@ def load_jobs_from_db():
         })
     return job_list
 
+@metrics.timed_function('recommend_jobs')
+def recommend_jobs(resume_text, top_k=5):
+    """Return the top_k jobs most similar to a resume, best first.
+
+    The resume is encoded once and scored against every stored JD vector with a
+    single matrix-vector product. Each job dict carries a 0-100 'match_score'.
+    """
+    conn = get_connection()
+    embedding_store.refresh_job_embeddings(conn)
+    rows = conn.execute("SELECT id, embedding FROM jobs").fetchall()
+    if not rows:
+        return []
+
+    job_ids = np.array([job_id for job_id, _ in rows])
+    job_matrix = np.vstack([_blob_to_embedding(blob) for _, blob in rows])
+    resume_embedding = encoder.encode([resume_text])[0]
+    similarities = job_matrix @ resume_embedding
+
+    top_k = min(top_k, len(rows))
+    top = np.argpartition(-similarities, top_k - 1)[:top_k]
+    top = top[np.argsort(-similarities[top])]
+
+    placeholders = ",".join("?" * len(top))
+    details = {
+        row[0]: row for row in conn.execute(
+            f"SELECT id, title, description, skills, timestamp FROM jobs WHERE id IN ({placeholders})",
+            [int(job_ids[i]) for i in top]
+        )
+    }
+
+    recommendations = []
+    for i in top:
+        job = details[int(job_ids[i])]
+        recommendations.append({
+            "id": job[0],
+            "title": job[1],
+            "description_full": job[2],
+            "skills": json.loads(job[3]),
+            "timestamp": job[4],
+            "match_score": round((float(similarities[i]) + 1) / 2 * 100)
+        })
+    return recommendations
+
 # --- File Processing ---
+SUPPORTED_TYPES = (
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+)
+# Bump when _extract_clean_text changes so cached text is recomputed.
+EXTRACTOR_VERSION = 2
+
+@metrics.timed_function('extract')
+def _extract_clean_text(file, truncated=None):
+    ext = '.pdf' if file.type == "application/pdf" else '.docx'
+    raw_text = extraction.extract_text(file, ext, truncated=truncated)
+
+    text = re.sub(r'(?<!\n)\n(?!\n)', ' ', raw_text) 
+    text = re.sub(r' +', ' ', text) 
+    return text.strip()
+
 def extract_text_from_file(file):
     """Extracts text from PDF or DOCX and cleans it."""
+    if file.type not in SUPPORTED_TYPES:
+        return "Unsupported file type."
     try:
-        if file.type == "application/pdf":
-            with pdfplumber.open(file) as pdf:
-                raw_text = "".join(page.extract_text() for page in pdf.pages if page.extract_text())
-        elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            raw_text = docx2txt.process(file)
-        else:
-            return "Unsupported file type."
-
-        text = re.sub(r'(?<!\n)\n(?!\n)', ' ', raw_text) 
-        text = re.sub(r' +', ' ', text) 
-        return text.strip()
+        # Cached by content hash, so re-submitted files and Streamlit reruns skip extraction.
+        # Text cut short by a page, size or time limit is not cached, so a slow moment does not stick.
+        data = file.getvalue()
+        truncated = set()
+        return text_cache.cached(
+            data, 'processor.text', EXTRACTOR_VERSION, lambda: _extract_clean_text(file, truncated),
+            cacheable=lambda: not truncated
+        )
     except Exception as e:
         return f"Error extracting text: {e}"
 
 # --- AI Analysis ---
-def analyze_resume(resume_text, jd_text):
-    """Analyzes resume against job description using the best available free model."""
+# Bump when the prompt or response handling changes so cached analyses are not reused.
+PROMPT_VERSION = 3
+RESPONSE_CACHE = llm.ResponseCache(
+    DB_PATH,
+    ttl_seconds=int(os.environ.get('HIRESIGHT_LLM_CACHE_TTL', 7 * 24 * 3600)),
+    max_entries=int(os.environ.get('HIRESIGHT_LLM_CACHE_MAX', 10000))
+)
+# Near-duplicate resumes share the cached analysis of their group's first resume.
+DUPLICATE_INDEX = dedup.DuplicateIndex(DB_PATH)
+_default_backend = None
+
+def get_default_backend():
+    """Return the configured LLM backend, or an error dict if it cannot be built.
+
+    Set HIRESIGHT_LLM_BACKEND=local to use the deterministic offline stand-in.
+    """
+    global _default_backend
+    if _default_backend is not None:
+        return _default_backend
+    if os.environ.get('HIRESIGHT_LLM_BACKEND') == 'local':
+        _default_backend = llm.LocalBackend()
+        return _default_backend
+
     # Check for the secret using st.secrets, which is the standard for Streamlit
     if "HUGGINGFACEHUB_API_TOKEN" not in st.secrets:
         return {"error": "Hugging Face API Token not found. Please check the secret name in your Streamlit settings. It must be exactly HUGGINGFACEHUB_API_TOKEN."}
     
     # Retrieve the key from st.secrets
-    hf_api_key = st.secrets["HUGGINGFACEHUB_API_TOKEN"]
+    _default_backend = llm.HuggingFaceBackend(
+        st.secrets["HUGGINGFACEHUB_API_TOKEN"], max_new_tokens=prompt_builder.MAX_OUTPUT_TOKENS
+    )
+    return _default_backend
 
-    try:
-        llm = HuggingFaceEndpoint(
-            repo_id="google/flan-t5-large",
-            huggingfacehub_api_token=hf_api_key,
-            task="text2text-generation",
-            temperature=0.1,
-            max_new_tokens=1500
-        )
-        
-        prompt = f"""You are an expert HR analyst. Analyze the resume against the job description.
-        Provide a detailed analysis ONLY in a valid JSON format. Do not provide any text or explanation before or after the JSON object.
-        The JSON should have these exact keys: "overallScore", "scoreGoodness", "skillsMatchedCount", "skillsMissingCount", "relevantProjectsCount", "matchedSkills", "missingSkills", "experience", "education", "improvements".
-
-        For "matchedSkills" and "missingSkills", create a list of JSON objects, each with a "skill" key.
-        For "experience" and "education", create a JSON object with keys like "match" and "level".
-        For "improvements", create a JSON object with a key "resume" which is a list of suggestion strings.
-
-        Resume: {resume_text}
-        Job Description: {jd_text}"""
-        response = llm.invoke(prompt)
-        
-        match = re.search(r'\{.*\}', response, re.DOTALL)
-        if match:
-            json_response_str = match.group(0)
-            return json.loads(json_response_str)
-        else:
-            return {"error": "The AI model returned an invalid response. The free model may be temporarily overloaded. Please try again in a few moments."}
+def build_prompt(resume_text, jd_text):
+    """Compact, token-budgeted analysis prompt; see prompt_builder.py."""
+    return prompt_builder.build_prompt(resume_text, jd_text)['prompt']
 
+def parse_analysis(response):
+    """Pull the JSON object out of a raw model response, or return an error dict."""
+    match = re.search(r'\{.*\}', response, re.DOTALL)
+    if match:
+        json_response_str = match.group(0)
+        return json.loads(json_response_str)
+    else:
+        return {"error": "The AI model returned an invalid response. The free model may be temporarily overloaded. Please try again in a few moments."}
+
+def analyze_resume(resume_text, jd_text, backend=None, use_cache=True, raise_overloaded=False):
+    """Analyzes resume against job description using the best available free model.
+
+    Successful analyses are cached in results.db, keyed by the resume, the JD,
+    PROMPT_VERSION and the backend's model parameters. A lightly edited re-upload
+    is resolved to the first resume of its near-duplicate group, so it reuses
+    that resume's analysis. With `raise_overloaded`, llm.OverloadedError
+    propagates so callers can retry instead of getting an error dict.
+    """
+    if backend is None:
+        backend = get_default_backend()
+        if isinstance(backend, dict):
+            return backend
+
+    if use_cache:
+        duplicate = DUPLICATE_INDEX.register(resume_text)
+        metrics.record_cache('near_duplicate', duplicate['duplicate'])
+        if not duplicate['duplicate']:
+            SCORE_STORE.schedule()  # Score the new resume against every job in the background.
+        key = RESPONSE_CACHE.make_key(duplicate['canonical_text'], jd_text, PROMPT_VERSION, backend)
+        cached = RESPONSE_CACHE.get(key)
+        metrics.record_cache('llm_cache', cached is not None)
+        if cached is not None:
+            return cached
+
+    try:
+        with metrics.timed('llm'):
+            response = backend.invoke(build_prompt(resume_text, jd_text))
+        result = parse_analysis(response)
+    except llm.OverloadedError:
+        if raise_overloaded:
+            raise
+        return {"error": "The AI model is temporarily overloaded. Please try again in a few moments."}
     except Exception as e:
-        return {"error": f"An error occurred during AI analysis: {e}"}
\ No newline at end of file
+        return {"error": f"An error occurred during AI analysis: {e}"}
+
+    if use_cache and 'error' not in result:
+        RESPONSE_CACHE.put(key, result)
+    return result
@@ -0,0 +1,121 @@
+import os
+
+import main
+from skill_matcher import SkillMatcher
+
+# --- Token-budgeted Prompts ---
+# The analysis prompt is built from parsed sections plus the locally computed
+# skill match, and trimmed so that prompt plus answer fit CONTEXT_TOKENS. Token
+# counts are estimated at about four characters per token, which is close enough
+# for budgeting without loading the model's tokenizer.
+CONTEXT_TOKENS = int(os.environ.get('HIRESIGHT_LLM_CONTEXT_TOKENS', '1024'))
+MAX_OUTPUT_TOKENS = int(os.environ.get('HIRESIGHT_LLM_MAX_OUTPUT_TOKENS', '384'))
+CHARS_PER_TOKEN = 4
+RESUME_SHARE = 0.6  # Of the excerpt budget; the rest goes to the JD.
+MAX_LISTED_SKILLS = 25  # Per skill list; the rest are summarized as "(+N more)".
+MAX_SECTION_TOKENS = 60  # Per experience, education or role line.
+MAX_SKILL_TOKENS = 10  # Per listed skill; badly split skill lists yield very long items.
+
+INSTRUCTIONS = """You are an expert HR analyst. Analyze the resume against the job description.
+Answer ONLY with a valid JSON object with these exact keys: "overallScore", "scoreGoodness", "skillsMatchedCount", "skillsMissingCount", "relevantProjectsCount", "matchedSkills", "missingSkills", "experience", "education", "improvements".
+"matchedSkills" and "missingSkills" are lists of objects with a "skill" key. "experience" and "education" are objects with "match" and "level" keys. "improvements" is an object whose "resume" key is a list of suggestion strings.
+The skill match below was computed exactly; use it for the skill fields."""
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _truncate(text, tokens):
+    """Cut `text` to at most `tokens` estimated tokens, at a word boundary."""
+    limit = max(tokens, 0) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    suffix = " ..."
+    if limit <= len(suffix):
+        return ""
+    return text[:limit - len(suffix)].rsplit(' ', 1)[0] + suffix
+
+
+def _capped(items, limit=MAX_LISTED_SKILLS):
+    """Comma-join at most `limit` items, each shortened, noting how many were left out."""
+    shown = ", ".join(_truncate(item, MAX_SKILL_TOKENS) for item in items[:limit])
+    return shown + (f" (+{len(items) - limit} more)" if len(items) > limit else "")
+
+
+def full_prompt(resume_text, jd_text):
+    """The uncompacted prompt (full raw texts), for comparison in reports."""
+    return f"{INSTRUCTIONS}\n\nResume: {resume_text}\nJob Description: {jd_text}"
+
+
+def build_prompt(resume_text, jd_text, context_tokens=CONTEXT_TOKENS, max_output_tokens=MAX_OUTPUT_TOKENS):
+    """Build the analysis prompt within `context_tokens - max_output_tokens` tokens.
+
+    Skill lists are capped and section lines shortened; if the instructions,
+    skill match and sections still do not fit, they are trimmed and the report
+    flags 'overflow'. The raw-text excerpts get whatever budget is left. Returns
+    a dict with the 'prompt', the 'hard_match' computed locally and a 'report'
+    of estimated token counts before and after compaction.
+    """
+    resume = main.parse_resume_sections(resume_text)
+    jd = main.parse_jd_sections(jd_text)
+    matcher = SkillMatcher(jd['must_have_skills'])
+    match = matcher.match(resume['skills'])
+    matched = {jd_skill for jd_skill, _ in match['matched_pairs']}
+    missing = [skill for skill in matcher.jd_skills if skill not in matched]
+
+    # The JD's must-have skills appear once, split into matched and missing.
+    skill_match = (
+        f"Skill match: {len(matched)} of {len(matcher.jd_skills)} must-have skills, "
+        f"hard score {match['score']:.1f}/50.\n"
+        f"Matched: {_capped([f'{jd_skill} (resume: {_truncate(resume_skill, MAX_SKILL_TOKENS)})' for jd_skill, resume_skill in match['matched_pairs']]) or 'none'}\n"
+        f"Missing: {_capped(missing) or 'none'}"
+    )
+    resume_sections = "\n".join(line for line in (
+        f"Skills: {_capped(resume['skills'])}" if resume['skills'] else "",
+        f"Experience: {_truncate('; '.join(resume['experience']), MAX_SECTION_TOKENS)}" if resume['experience'] else "",
+        f"Education: {_truncate('; '.join(resume['education']), MAX_SECTION_TOKENS)}" if resume['education'] else "",
+    ) if line)
+    jd_sections = f"Role: {_truncate(jd['role_title'], MAX_SECTION_TOKENS)}" if jd['role_title'] else ""
+
+    def assemble(resume_excerpt, jd_excerpt):
+        return (
+            f"{INSTRUCTIONS}\n\n{skill_match}\n\n"
+            f"Resume:\n{resume_sections}\nExcerpt: {resume_excerpt}\n"
+            f"Job Description:\n{jd_sections}\nExcerpt: {jd_excerpt}"
+        )
+
+    budget = context_tokens - max_output_tokens
+    # Fixed parts that do not fit are trimmed: sections first, then the skill match.
+    overflow = estimate_tokens(assemble("", "")) > budget
+    if overflow:
+        fixed = estimate_tokens(assemble("", "")) - estimate_tokens(resume_sections + jd_sections + skill_match)
+        spare = max(budget - fixed, 0)
+        skill_match = _truncate(skill_match, spare // 2)
+        spare -= estimate_tokens(skill_match)
+        resume_sections = _truncate(resume_sections, spare * 2 // 3)
+        jd_sections = _truncate(jd_sections, spare - estimate_tokens(resume_sections))
+
+    excerpt_budget = max(budget - estimate_tokens(assemble("", "")), 0)
+    resume_budget = int(excerpt_budget * RESUME_SHARE)
+    jd_budget = excerpt_budget - resume_budget
+    # A short document hands its unused share to the other one.
+    spare_resume = max(resume_budget - estimate_tokens(resume_text), 0)
+    spare_jd = max(jd_budget - estimate_tokens(jd_text), 0)
+    prompt = assemble(_truncate(resume_text, resume_budget + spare_jd), _truncate(jd_text, jd_budget + spare_resume))
+    if estimate_tokens(prompt) > budget:
+        # Only reachable by rounding in the estimates, or when the instructions alone exceed the budget.
+        overflow = overflow or estimate_tokens(assemble("", "")) > budget
+        prompt = prompt[:max(budget, 0) * CHARS_PER_TOKEN]
+
+    return {
+        'prompt': prompt,
+        'hard_match': match,
+        'report': {
+            'full_prompt_tokens': estimate_tokens(full_prompt(resume_text, jd_text)),
+            'prompt_tokens': estimate_tokens(prompt),
+            'prompt_budget': budget,
+            'max_output_tokens': max_output_tokens,
+            'overflow': overflow,
+        },
+    }
@@ -0,0 +1,92 @@
+import os
+import json
+
+# --- Streaming Results ---
+# Batch runs append one JSON record per scored pair and flush it immediately, so
+# the output file doubles as the checkpoint: a rerun skips every pair already in it.
+SUMMARY_COLUMNS = ['resume_file', 'jd_file', 'hard_score', 'soft_score', 'total_score']
+
+
+def pair_key(record):
+    return record['resume_file'], record['jd_file']
+
+
+def read_records(path):
+    """Yield every complete record in a JSONL results file."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.endswith('\n') and line.strip():
+                yield json.loads(line)
+
+
+class ResultStream:
+    """Append-only JSONL writer that remembers which pairs are already scored."""
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._drop_partial_line()
+        # Only the light score columns of earlier records are kept, for rankings.
+        self.completed = {
+            pair_key(record): {column: record[column] for column in SUMMARY_COLUMNS}
+            for record in read_records(path)
+        }
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _drop_partial_line(self):
+        """Truncate a record cut off by a crash mid-write."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def is_done(self, resume_file, jd_file):
+        return (resume_file, jd_file) in self.completed
+
+    def write(self, record):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.completed[pair_key(record)] = {column: record[column] for column in SUMMARY_COLUMNS}
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_summary(jsonl_path, summary_path=None):
+    """Write the score columns of a results file as a compact columnar summary.
+
+    Uses Parquet when pyarrow is installed, otherwise a JSON object of column
+    lists. Records are streamed from disk. Returns the path written.
+    """
+    columns = {column: [] for column in SUMMARY_COLUMNS}
+    for record in read_records(jsonl_path):
+        for column in SUMMARY_COLUMNS:
+            columns[column].append(record[column])
+
+    base = os.path.splitext(jsonl_path)[0]
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        summary_path = summary_path or base + '.summary.json'
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(columns, f)
+        return summary_path
+
+    summary_path = summary_path or base + '.summary.parquet'
+    pq.write_table(pa.table(columns), summary_path)
+    return summary_path
@@ -1,40 +1,50 @@
-import pdfplumber
-import docx
-import re
 import os
 
-def parse_pdf(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            # Simple removal of potential headers/footers (e.g., page numbers)
-            text += re.sub(r'^\s*Page \d+\s*|\s*-\s*Page \d+\s*$', '', page_text, flags=re.MULTILINE)
-    return text.strip()
+import extraction
+import ingest
+import text_cache
 
-def parse_docx(file_path):
-    doc = docx.Document(file_path)
-    text = "\n".join([para.text for para in doc.paragraphs])
-    return text.strip()
+# Bump when parse_pdf/parse_docx output changes so cached text is recomputed.
+PARSER_VERSION = 2
+
+def parse_pdf(file_path, truncated=None):
+    # Page-number headers/footers are stripped from every page.
+    return extraction.extract_text(file_path, '.pdf', strip_headers=True, truncated=truncated).strip()
+
+def parse_docx(file_path, truncated=None):
+    return extraction.extract_text(file_path, '.docx', truncated=truncated).strip()
 
 def parse_resume(file_path):
     if file_path.lower().endswith('.pdf'):
-        return parse_pdf(file_path)
+        parse = parse_pdf
     elif file_path.lower().endswith('.docx'):
-        return parse_docx(file_path)
+        parse = parse_docx
     else:
         raise ValueError("Unsupported file format. Use PDF or DOCX.")
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    # Text cut short by a page, size or time limit is not cached.
+    truncated = set()
+    return text_cache.cached(
+        data, f'resume_parser.{parse.__name__}', PARSER_VERSION, lambda: parse(file_path, truncated),
+        cacheable=lambda: not truncated
+    )
 
 def test_parsing():
     import os
     folder_path = r"C:\Projects\ResumeRelevanceSystem\Resumes"  # Folder containing resumes
     try:
-        for filename in os.listdir(folder_path):
-            if filename.lower().endswith(('.pdf', '.docx')):
-                file_path = os.path.join(folder_path, filename)
-                parsed_text = parse_resume(file_path)
-                print(f"\nParsed Resume Text for {filename}:")
-                print(parsed_text)
+        filenames = sorted(f for f in os.listdir(folder_path) if f.lower().endswith(('.pdf', '.docx')))
+        # The whole folder is extracted in parallel; a bad file only affects its own entry.
+        results = ingest.extract_many([os.path.join(folder_path, f) for f in filenames], strip_headers=True, normalize=False)
+        for filename, result in zip(filenames, results):
+            if result['error']:
+                print(f"\nError parsing {filename}: {result['error']}")
+                continue
+            if result['truncated']:
+                print(f"\n{filename} was cut short by the {', '.join(result['truncated'])} limit.")
+            print(f"\nParsed Resume Text for {filename}:")
+            print(result['text'])
     except Exception as e:
         print(f"Error: {e}")
 
@@ -0,0 +1,265 @@
+import json
+import time
+import threading
+
+import numpy as np
+
+import db
+import main
+import encoder
+import metrics
+import embedding_store
+import skill_matcher
+from skill_matcher import SkillMatcher
+
+# --- Materialized Scores ---
+# Hard/soft scores for every (resume, job) pair, keyed by the resume's fingerprint
+# (see dedup.py), the job id and the scorer version. New jobs and resumes only
+# add missing pairs, which are computed in a background thread from stored
+# vectors; ranking candidates for a job is then one indexed query.
+SCORER_VERSION = 1  # Bump when hard/soft scoring changes in a way the parts below don't capture.
+CHUNK_SIZE = 512
+
+
+def scorer_version():
+    """Everything that changes a score; rows computed under another version are recomputed."""
+    return "/".join(str(part) for part in (
+        SCORER_VERSION,
+        main.SECTIONS_CACHE_VERSION,
+        encoder.model_id(),
+        skill_matcher.FUZZY_THRESHOLD,
+        skill_matcher.MAX_HARD_SCORE,
+    ))
+
+
+class ScoreStore:
+    """Scores table in results.db, filled incrementally with only the missing pairs.
+
+    Scores cover canonical resumes from the dedup `resumes` table against every
+    job in `jobs`. Near-duplicate uploads share their canonical resume's scores.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = False
+        self._pruned_version = None
+        self._ready = False
+
+    def _connect(self):
+        conn = db.thread_connection(self.db_path)
+        if not self._ready:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scores (
+                    fingerprint TEXT NOT NULL,
+                    job_id INTEGER NOT NULL,
+                    scorer_version TEXT NOT NULL,
+                    hard_score REAL NOT NULL,
+                    soft_score REAL NOT NULL,
+                    total_score REAL NOT NULL,
+                    matched_skills TEXT NOT NULL,
+                    computed REAL NOT NULL,
+                    PRIMARY KEY (fingerprint, job_id, scorer_version)
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scores_ranking ON scores (job_id, scorer_version, total_score DESC)"
+            )
+            conn.commit()
+            self._ready = True
+        return conn
+
+    # --- Computing ---
+    @staticmethod
+    def _sources_exist(conn):
+        # The resumes and jobs tables belong to dedup.py and processor.py.
+        return conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('resumes', 'jobs')"
+        ).fetchone()[0] == 2
+
+    def _missing_pairs(self, conn, version, fingerprints, job_ids=None):
+        """(fingerprint, job_id) pairs without a current score, for the given canonical resumes."""
+        query = f"""
+            SELECT r.fingerprint, j.id FROM resumes r CROSS JOIN jobs j
+            WHERE r.id = r.canonical_id AND r.fingerprint IN ({','.join('?' * len(fingerprints))})
+              AND NOT EXISTS (
+                SELECT 1 FROM scores s
+                WHERE s.fingerprint = r.fingerprint AND s.job_id = j.id AND s.scorer_version = ?
+            )
+        """
+        params = list(fingerprints) + [version]
+        if job_ids is not None:
+            query += f" AND j.id IN ({','.join('?' * len(job_ids))})"
+            params += list(job_ids)
+        return conn.execute(query, params).fetchall()
+
+    def _job_vectors(self, conn, job_ids):
+        embedding_store.refresh_job_embeddings(conn, job_ids)
+        rows = conn.execute(
+            f"SELECT id, skills, embedding FROM jobs WHERE id IN ({','.join('?' * len(job_ids))})",
+            list(job_ids)
+        ).fetchall()
+        return {
+            job_id: (np.frombuffer(blob, dtype=np.float32), json.loads(skills or '[]'))
+            for job_id, skills, blob in rows
+        }
+
+    def materialize(self, fingerprints=None, job_ids=None):
+        """Compute and store every missing (resume, job) pair; returns how many were added.
+
+        `fingerprints` and `job_ids` narrow the work to those resumes and jobs.
+        Resumes are processed CHUNK_SIZE at a time, each text loaded once, so a
+        scorer version change does not load every pair's resume text at once.
+        """
+        version = scorer_version()
+        conn = self._connect()
+        if not self._sources_exist(conn):
+            return 0
+        full_run = fingerprints is None and job_ids is None
+        if fingerprints is None:
+            fingerprints = [row[0] for row in conn.execute("SELECT fingerprint FROM resumes WHERE id = canonical_id")]
+        jobs = {}
+        added = 0
+        # Vectors come from the embedding store, so resumes scored before are not re-encoded.
+        store = embedding_store.open_store('resumes')
+        for start in range(0, len(fingerprints), CHUNK_SIZE):
+            missing = self._missing_pairs(conn, version, fingerprints[start:start + CHUNK_SIZE], job_ids)
+            if missing:
+                rows = self._score_pairs(conn, version, missing, jobs, store)
+                with conn:
+                    conn.executemany(
+                        """INSERT OR REPLACE INTO scores (fingerprint, job_id, scorer_version, hard_score,
+                               soft_score, total_score, matched_skills, computed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                        rows
+                    )
+                added += len(rows)
+        if full_run and self._pruned_version != version:
+            self._prune(conn, version)
+        return added
+
+    def _score_pairs(self, conn, version, missing, jobs, store):
+        """Score rows for one chunk of missing pairs; `jobs` caches job vectors across chunks."""
+        by_job = {}
+        for fingerprint, job_id in missing:
+            by_job.setdefault(job_id, []).append(fingerprint)
+        new_jobs = [job_id for job_id in by_job if job_id not in jobs]
+        if new_jobs:
+            jobs.update(self._job_vectors(conn, new_jobs))
+
+        with metrics.timed('scores.materialize', items=len(missing)):
+            resume_fingerprints = list(dict.fromkeys(fingerprint for fingerprint, _ in missing))
+            texts = dict(conn.execute(
+                f"SELECT fingerprint, text FROM resumes WHERE fingerprint IN ({','.join('?' * len(resume_fingerprints))})",
+                resume_fingerprints
+            ).fetchall())
+            vectors = embedding_store.encode_with_store(store, [texts[fp] for fp in resume_fingerprints])
+            resume_vectors = dict(zip(resume_fingerprints, vectors))
+            resume_skills = {fp: main.parse_resume_sections(texts[fp])['skills'] for fp in resume_fingerprints}
+
+            rows = []
+            now = time.time()
+            for job_id, job_fingerprints in by_job.items():
+                job_vector, job_skills = jobs[job_id]
+                matches = SkillMatcher(job_skills).match_many([resume_skills[fp] for fp in job_fingerprints])
+                cosine = np.vstack([resume_vectors[fp] for fp in job_fingerprints]) @ job_vector
+                soft_scores = np.minimum((cosine + 1) / 2 * 50, 50)
+                for fingerprint, match, soft_score in zip(job_fingerprints, matches, soft_scores):
+                    rows.append((
+                        fingerprint, job_id, version, match['score'], float(soft_score),
+                        match['score'] + float(soft_score), json.dumps(match['matched_pairs']), now
+                    ))
+        return rows
+
+    def _prune(self, conn, version):
+        # Only called after a full run, when every pair has a current-version row.
+        with conn:
+            conn.execute("DELETE FROM scores WHERE scorer_version != ?", (version,))
+        self._pruned_version = version
+
+    def schedule(self):
+        """Materialize missing pairs in a background thread; calls during a run queue one more run."""
+        with self._lock:
+            self._pending = True
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="score-materializer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                self._pending = False
+            try:
+                self.materialize()
+            except Exception as e:
+                print(f"Score materialization failed: {e}")
+
+    # --- Queries ---
+    def scores_for(self, fingerprint, job_ids):
+        """Scores of one canonical resume against `job_ids`, computing any that are missing. Best first."""
+        self.materialize(fingerprints=[fingerprint], job_ids=job_ids)
+        rows = self._connect().execute(
+            f"""SELECT s.job_id, j.title, s.hard_score, s.soft_score, s.total_score, s.matched_skills
+                FROM scores s JOIN jobs j ON j.id = s.job_id
+                WHERE s.fingerprint = ? AND s.scorer_version = ? AND s.job_id IN ({','.join('?' * len(job_ids))})
+                ORDER BY s.total_score DESC""",
+            [fingerprint, scorer_version()] + list(job_ids)
+        ).fetchall()
+        return [
+            {
+                'job_id': row[0],
+                'title': row[1],
+                'hard_score': row[2],
+                'soft_score': row[3],
+                'total_score': row[4],
+                'matched_skills': json.loads(row[5]),
+            }
+            for row in rows
+        ]
+
+    def ranked_candidates(self, job_id, limit=50):
+        """Top stored candidates for a job, best first, with the latest upload name if any."""
+        conn = self._connect()
+        if not self._sources_exist(conn):
+            return []
+        has_queue = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ingest_queue'"
+        ).fetchone()
+        upload_name = (
+            "(SELECT q.filename FROM ingest_queue q JOIN resumes d ON d.id = q.resume_id "
+            "WHERE d.canonical_id = r.id ORDER BY q.id DESC LIMIT 1)"
+            if has_queue else "NULL"
+        )
+        rows = conn.execute(
+            f"""SELECT r.id, {upload_name}, s.hard_score, s.soft_score, s.total_score, s.matched_skills
+                FROM scores s JOIN resumes r ON r.fingerprint = s.fingerprint
+                WHERE s.job_id = ? AND s.scorer_version = ?
+                ORDER BY s.total_score DESC LIMIT ?""",
+            (job_id, scorer_version(), limit)
+        ).fetchall()
+        return [
+            {
+                'resume_id': row[0],
+                'filename': row[1],
+                'hard_score': row[2],
+                'soft_score': row[3],
+                'total_score': row[4],
+                'matched_skills': json.loads(row[5]),
+            }
+            for row in rows
+        ]
+
+    def stats(self):
+        """Stored and still-missing pair counts for the current scorer version."""
+        version = scorer_version()
+        conn = self._connect()
+        if not self._sources_exist(conn):
+            return {'stored': 0, 'missing': 0}
+        stored = conn.execute("SELECT COUNT(*) FROM scores WHERE scorer_version = ?", (version,)).fetchone()[0]
+        canonical = conn.execute("SELECT COUNT(*) FROM resumes WHERE id = canonical_id").fetchone()[0]
+        jobs = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return {'stored': stored, 'missing': canonical * jobs - stored}
@@ -0,0 +1,226 @@
+"""Local scoring service: one warm embedding model shared over HTTP.
+
+Run on each node:
+
+    python scoring_service.py [--port 8765] [--max-wait-ms 10] [--max-queue 256] [--stub]
+
+and point clients at it with HIRESIGHT_SCORING_URL=http://127.0.0.1:8765, which
+makes encoder.encode() call the service instead of loading torch in-process.
+
+Endpoints (JSON in, JSON out):
+    POST /embed  {"texts": [...]}                         -> {"embeddings": [[...], ...]}
+    POST /score  {"resume_text": ..., "jd_texts": [...]}  -> {"scores": [{hard/soft/total}, ...]}
+    GET  /health                                          -> model id, queue depth, batch stats
+
+Concurrent requests are merged into micro-batches: the batcher waits up to
+--max-wait-ms for more texts after the first arrives. When --max-queue requests
+are already waiting, new ones get 503 with Retry-After, so clients back off
+instead of piling up.
+"""
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import main
+import encoder
+
+DEFAULT_PORT = 8765
+MAX_WAIT_SECONDS = 0.010
+MAX_BATCH_TEXTS = 256
+MAX_QUEUE = 256
+
+
+class QueueFullError(Exception):
+    """The batcher's queue is full; the caller should retry later."""
+
+
+class MicroBatcher:
+    """Merges concurrent encode requests into one encoder.encode call.
+
+    submit() returns a Future resolving to that request's embeddings. A single
+    worker thread takes the first waiting request, then keeps collecting until
+    `max_batch_texts` texts are gathered or `max_wait` seconds have passed.
+    """
+
+    def __init__(self, max_wait=MAX_WAIT_SECONDS, max_batch_texts=MAX_BATCH_TEXTS, max_queue=MAX_QUEUE):
+        self.max_wait = max_wait
+        self.max_batch_texts = max_batch_texts
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.rejected = 0
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, texts):
+        future = Future()
+        try:
+            self._queue.put_nowait((list(texts), future))
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise QueueFullError("Scoring queue is full.") from None
+        return future
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_texts:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = encoder.encode(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[start:start + len(request_texts)])
+                start += len(request_texts)
+            with self._stats_lock:
+                self.batches += 1
+                self.texts += len(texts)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queue_depth': self.depth(),
+                'batches': self.batches,
+                'texts': self.texts,
+                'mean_batch_size': round(self.texts / self.batches, 2) if self.batches else None,
+                'rejected': self.rejected,
+            }
+
+
+def score(batcher, resume_text, jd_texts):
+    """Hard and soft scores of one resume against several JDs, as in main.py."""
+    embeddings = batcher.submit([resume_text] + list(jd_texts)).result()
+    resume_skills = main.parse_resume_sections(resume_text)['skills']
+    scores = []
+    for jd_text, jd_embedding in zip(jd_texts, embeddings[1:]):
+        jd_skills = main.parse_jd_sections(jd_text)['must_have_skills']
+        hard_score, matched_pairs = main.hard_match_score(resume_skills, jd_skills)
+        soft_score = main.cosine_to_soft_score(embeddings[0] @ jd_embedding)
+        scores.append({
+            'hard_score': hard_score,
+            'soft_score': soft_score,
+            'total_score': hard_score + soft_score,
+            'matched_skills': matched_pairs,
+        })
+    return scores
+
+
+def _string_list(request, key):
+    """request[key] if it is a list of strings; a bare string would be embedded character by character."""
+    value = request[key]
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"'{key}' must be a list of strings.")
+    return value
+
+
+def _string(request, key):
+    value = request[key]
+    if not isinstance(value, str):
+        raise ValueError(f"'{key}' must be a string.")
+    return value
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    batcher = None  # Set by serve().
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send(404, {'error': 'Not found.'})
+            return
+        self._send(200, {'status': 'ok', 'model': encoder.model_id(), **self.batcher.stats()})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/embed':
+                texts = _string_list(request, 'texts')
+                embeddings = self.batcher.submit(texts).result()
+                self._send(200, {'embeddings': embeddings.tolist()})
+            elif self.path == '/score':
+                jd_texts = _string_list(request, 'jd_texts') if 'jd_texts' in request else [_string(request, 'jd_text')]
+                self._send(200, {'scores': score(self.batcher, _string(request, 'resume_text'), jd_texts)})
+            else:
+                self._send(404, {'error': 'Not found.'})
+        except QueueFullError as e:
+            self._send(503, {'error': str(e)}, {'Retry-After': '1'})
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {'error': f"Bad request: {e}"})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        pass  # Keep per-request access logs off the console.
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # Listen backlog; the default of 5 resets bursts of clients.
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, batcher=None):
+    """Start the service (blocking until interrupted)."""
+    ScoringHandler.batcher = batcher or MicroBatcher()
+    server = ScoringServer((host, port), ScoringHandler)
+    print(f"Scoring service on http://{host}:{port} (model {encoder.model_id()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local scoring service with micro-batched embeddings.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_SECONDS * 1000,
+                        help="How long a batch waits for more requests after the first.")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH_TEXTS, help="Most texts per encode call.")
+    parser.add_argument('--max-queue', type=int, default=MAX_QUEUE,
+                        help="Waiting requests beyond this are rejected with 503.")
+    parser.add_argument('--stub', action='store_true', help="Serve encoder.StubModel instead of the real model.")
+    args = parser.parse_args()
+
+    # The service always holds the model itself, even if HIRESIGHT_SCORING_URL is set.
+    encoder.set_model(encoder.StubModel() if args.stub else encoder.load_model())
+    serve(args.host, args.port, MicroBatcher(args.max_wait_ms / 1000, args.max_batch, args.max_queue))
@@ -0,0 +1,55 @@
+import re
+
+# --- Section Segmentation ---
+# All section headers are found in one left-to-right scan with a single compiled
+# alternation, and the text is sliced into sections by header offsets. Cost is
+# linear in the text length no matter how many sections are configured.
+
+
+class Segmenter:
+    """Splits documents into named sections using a configurable header vocabulary.
+
+    `headers` maps a section name to a list of regex patterns for its header,
+    e.g. {'skills': [r'skills', r'technical skills']}. Patterns are matched
+    case-insensitively on word boundaries, followed by an optional colon.
+    With `capitalized=True` only occurrences starting with an uppercase letter
+    count as headers, so a lowercase mention mid-sentence ("experience in
+    sales") does not start or end a section.
+    """
+
+    def __init__(self, headers, capitalized=False):
+        self.names = list(headers)
+        self.capitalized = capitalized
+        groups = [
+            f"(?P<s{i}>{'|'.join(f'(?:{p})' for p in patterns)})"
+            for i, patterns in enumerate(headers.values())
+        ]
+        self._pattern = re.compile(r'\b(?:' + '|'.join(groups) + r')\b\s*:?\s*', re.IGNORECASE)
+
+    def find_headers(self, text):
+        """Return (name, start, end) for every header occurrence, in text order."""
+        return [
+            (self.names[int(match.lastgroup[1:])], match.start(), match.end())
+            for match in self._pattern.finditer(text)
+            if not self.capitalized or text[match.start()].isupper()
+        ]
+
+    def segment(self, text):
+        """Return {name: body} for each section found.
+
+        A section starts after the first occurrence of its header and runs until
+        the next header that belongs to a different section (repeats of its own
+        header, like "Soft Skills" inside Skills, do not end it).
+        """
+        headers = self.find_headers(text)
+        # Backward pass: where the next header of a different section starts.
+        body_ends = [len(text)] * len(headers)
+        for i in range(len(headers) - 2, -1, -1):
+            next_name, next_start, _ = headers[i + 1]
+            body_ends[i] = next_start if next_name != headers[i][0] else body_ends[i + 1]
+
+        sections = {}
+        for (name, _, body_start), body_end in zip(headers, body_ends):
+            if name not in sections:
+                sections[name] = text[body_start:body_end].strip()
+        return sections
@@ -0,0 +1,91 @@
+import numpy as np
+from rapidfuzz import fuzz, process
+
+# --- Skill Matching ---
+# A JD skill counts as matched when a resume skill contains it or scores above
+# FUZZY_THRESHOLD on partial_ratio. A contained skill always scores 100 on
+# partial_ratio, so one batched cdist call covers both tests.
+FUZZY_THRESHOLD = 80
+MAX_HARD_SCORE = 50
+# Below this many (jd, resume) skill pairs, starting cdist's thread pool costs more than it saves.
+PARALLEL_MIN_PAIRS = 2000
+
+
+def normalize_skills(skills):
+    """Strip, lowercase and deduplicate skills.
+
+    Returns (display, normalized): the first spelling seen for each skill and its
+    normalized form, in original order. Empty entries are dropped.
+    """
+    display, normalized, seen = [], [], set()
+    for skill in skills:
+        key = skill.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            display.append(skill.strip())
+            normalized.append(key)
+    return display, normalized
+
+
+class SkillMatcher:
+    """Matches resumes against one JD's skill set, normalized once up front."""
+
+    def __init__(self, jd_skills, threshold=FUZZY_THRESHOLD):
+        self.jd_skills, self._jd_normalized = normalize_skills(jd_skills)
+        self.threshold = threshold
+
+    def _result(self, scores, resume_display):
+        """Build a match result from a (jd_skills x resume_skills) score matrix."""
+        if not self.jd_skills or not resume_display:
+            return {
+                'score': 0,
+                'matched_pairs': [],
+                'skill_scores': {skill: 0 for skill in self.jd_skills},
+            }
+        hits = scores > self.threshold
+        matched_rows = hits.any(axis=1)
+        # First resume skill (in resume order) that matches each JD skill.
+        first_hit = hits.argmax(axis=1)
+        matched_pairs = [
+            (self.jd_skills[i], resume_display[first_hit[i]])
+            for i in np.flatnonzero(matched_rows)
+        ]
+        score = matched_rows.sum() / len(self.jd_skills) * MAX_HARD_SCORE
+        return {
+            'score': min(float(score), MAX_HARD_SCORE),
+            'matched_pairs': matched_pairs,
+            'skill_scores': dict(zip(self.jd_skills, scores.max(axis=1).tolist())),
+        }
+
+    def _scores(self, resume_normalized, workers=1):
+        return process.cdist(
+            self._jd_normalized, resume_normalized,
+            scorer=fuzz.partial_ratio, dtype=np.uint8, workers=workers
+        )
+
+    def match(self, resume_skills):
+        """Match one resume's skills.
+
+        Returns a dict with 'score' (0-50), 'matched_pairs' [(jd_skill, resume_skill)]
+        and 'skill_scores' {jd_skill: best partial_ratio against the resume}.
+        """
+        resume_display, resume_normalized = normalize_skills(resume_skills)
+        if not self.jd_skills or not resume_display:
+            return self._result(None, resume_display)
+        return self._result(self._scores(resume_normalized), resume_display)
+
+    def match_many(self, resume_skill_lists):
+        """Match many resumes with a single cdist call over all their skills."""
+        normalized_lists = [normalize_skills(skills) for skills in resume_skill_lists]
+        all_normalized = [skill for _, normalized in normalized_lists for skill in normalized]
+        if not self.jd_skills or not all_normalized:
+            return [self._result(None, display) for display, _ in normalized_lists]
+
+        parallel = len(self._jd_normalized) * len(all_normalized) >= PARALLEL_MIN_PAIRS
+        scores = self._scores(all_normalized, workers=-1 if parallel else 1)
+        results, start = [], 0
+        for display, normalized in normalized_lists:
+            stop = start + len(normalized)
+            results.append(self._result(scores[:, start:stop], display))
+            start = stop
+        return results
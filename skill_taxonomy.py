@@ -0,0 +1,147 @@
+import os
+import json
+import hashlib
+
+# --- Skill Taxonomy ---
+# Canonical skills with their aliases, loaded from skill_taxonomy.json (or the
+# file named by HIRESIGHT_SKILL_TAXONOMY) and compiled once into an Aho-Corasick
+# automaton. A document is scanned in one left-to-right pass whose cost depends
+# on the text length, not on how many skills or aliases the taxonomy holds.
+TAXONOMY_PATH = os.environ.get(
+    'HIRESIGHT_SKILL_TAXONOMY',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+)
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def _fold(ch):
+    # Characters whose lowercase form is longer (e.g. 'İ') are kept as is, so text positions stay aligned.
+    lower = ch.lower()
+    return lower if len(lower) == 1 else ch
+
+
+class _Automaton:
+    """Aho-Corasick automaton over a set of (pattern, value) pairs."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+    def add(self, pattern, value):
+        state = 0
+        for ch in pattern:
+            if ch not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][ch] = len(self.goto) - 1
+            state = self.goto[state][ch]
+        self.output[state].append((len(pattern), value))
+
+    def build(self):
+        """Set failure links breadth-first and merge each state's outputs with its fallback's."""
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+
+    def step(self, state, ch):
+        while state and ch not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(ch, 0)
+
+
+class SkillTaxonomy:
+    """Finds canonical skills in text by their names and aliases.
+
+    `skills` is a list of dicts with an 'id', a display 'name', optional
+    'aliases' (matched case-insensitively, like the name) and optional
+    'exact_aliases' (matched case-sensitively, for short names such as "R"
+    that are also ordinary letters or words). `ignore` lists case-sensitive
+    phrases that contain an alias but are not the skill, such as "R&D". Matches
+    respect word boundaries, any run of whitespace matches a single space, and
+    overlapping matches are resolved leftmost-longest.
+    """
+
+    def __init__(self, skills, ignore=(), version=None):
+        self.skills = {skill['id']: skill for skill in skills}
+        self.version = version
+        self._folded = _Automaton()
+        self._exact = _Automaton()
+        for skill in skills:
+            exact = skill.get('exact_aliases', [])
+            names = ([] if skill['name'] in exact else [skill['name']]) + skill.get('aliases', [])
+            for alias in dict.fromkeys(' '.join(name.split()).lower() for name in names):
+                self._folded.add(alias, skill['id'])
+            for alias in exact:
+                self._exact.add(' '.join(alias.split()), skill['id'])
+        for phrase in ignore:
+            # Matched like a skill so it wins leftmost-longest, then dropped.
+            self._exact.add(' '.join(phrase.split()), None)
+        self._folded.build()
+        self._exact.build()
+
+    @classmethod
+    def load(cls, path=TAXONOMY_PATH):
+        with open(path, 'rb') as f:
+            data = f.read()
+        taxonomy = json.loads(data)
+        # The file's content hash versions anything cached from its matches.
+        return cls(taxonomy['skills'], taxonomy.get('ignore', ()), version=hashlib.sha256(data).hexdigest()[:12])
+
+    def scan(self, text):
+        """Return (skill_id, start, end) for every match, in text order, without overlaps."""
+        candidates = []
+        folded_state = exact_state = 0
+        # Original-text offset where each automaton character came from, for mapping matches back.
+        offsets = []
+        previous_space = True
+        for i, ch in enumerate(text):
+            if ch.isspace():
+                if previous_space:
+                    continue
+                ch = ' '
+            previous_space = ch == ' '
+            offsets.append(i)
+            folded_state = self._folded.step(folded_state, _fold(ch))
+            exact_state = self._exact.step(exact_state, ch)
+            for length, skill_id in self._folded.output[folded_state] + self._exact.output[exact_state]:
+                start, end = offsets[-length], i + 1
+                if _is_word_char(text[start]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(text[i]) and end < len(text) and _is_word_char(text[end]):
+                    continue
+                candidates.append((start, end, skill_id))
+
+        matches = []
+        covered_until = 0
+        for start, end, skill_id in sorted(candidates, key=lambda match: (match[0], -match[1])):
+            if start >= covered_until:
+                matches.append((skill_id, start, end))
+                covered_until = end
+        return [match for match in matches if match[0] is not None]
+
+    def extract(self, text):
+        """Canonical skills found in `text`, by first occurrence.
+
+        Returns {skill_id: {'name', 'count', 'positions': [(start, end), ...]}}.
+        """
+        found = {}
+        for skill_id, start, end in self.scan(text):
+            entry = found.setdefault(skill_id, {'name': self.skills[skill_id]['name'], 'count': 0, 'positions': []})
+            entry['count'] += 1
+            entry['positions'].append((start, end))
+        return found
+
+    def skill_names(self, text):
+        """Display names of the skills found in `text`, by first occurrence."""
+        return [entry['name'] for entry in self.extract(text).values()]
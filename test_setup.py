@@ -3,9 +3,9 @@ import docx
 import spacy
 import nltk
 from langchain import __version__ as lc_version
-from sentence_transformers import SentenceTransformer
+import encoder
 
 print("All imports successful!")
 print(f"LangChain version: {lc_version}")
-model = SentenceTransformer('all-MiniLM-L6-v2')  # Test embedding model
+model = encoder.get_model()  # Test embedding model
 print("Embedding model loaded.")
\ No newline at end of file
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import functools
+
+import metrics
+
+# --- On-disk Cache ---
+# Content-addressed cache for extracted text and parsed sections. Keys are a hash
+# of the input bytes plus the namespace and version of the code that produced the
+# value, so changing an extractor only requires bumping its version.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+CACHE_PATH = os.path.join(CACHE_DIR, 'text_cache.db')
+MAX_BYTES = int(os.environ.get('HIRESIGHT_TEXT_CACHE_MB', '256')) * 1024 * 1024
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False, timeout=30)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used)")
+        _conn.commit()
+    return _conn
+
+
+def make_key(data, namespace, version):
+    """Hash `data` (bytes or str) together with the producer's namespace and version."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{namespace}:{version}:{digest}"
+
+
+def get(key):
+    """Return the cached value for `key`, or None. Hits refresh the LRU position."""
+    with _lock:
+        conn = _get_conn()
+        row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+    return json.loads(row[0])
+
+
+def put(key, value):
+    """Store a JSON-serializable value and evict least recently used entries over MAX_BYTES."""
+    payload = json.dumps(value)
+    namespace = key.split(':', 1)[0]
+    with _lock:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, namespace, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, namespace, payload, len(payload), time.time())
+        )
+        _evict(conn)
+        conn.commit()
+
+
+def _evict(conn):
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if total <= MAX_BYTES:
+        return
+    rows = conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC")
+    stale = []
+    for key, size in rows:
+        if total <= MAX_BYTES:
+            break
+        stale.append((key,))
+        total -= size
+    conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+
+def cached(data, namespace, version, compute, cacheable=None):
+    """Return compute() for this content, reading and filling the cache.
+
+    `cacheable`, if given, is called after compute(); the value is only stored
+    when it returns true (e.g. not for text cut short by a time limit).
+    """
+    key = make_key(data, namespace, version)
+    value = get(key)
+    metrics.record_cache('text_cache', value is not None)
+    if value is None:
+        value = compute()
+        if cacheable is None or cacheable():
+            put(key, value)
+    return value
+
+
+def memoize(namespace, version):
+    """Decorator caching a function of a single text argument by content hash."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(text):
+            return cached(text, namespace, version, lambda: func(text))
+        return wrapper
+    return decorator
+
+
+def clear():
+    """Drop every cached entry."""
+    with _lock:
+        conn = _get_conn()
+        conn.execute("DELETE FROM entries")
+        conn.commit()